@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import Job, OutboxMessage
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'task', 'status', 'attempts', 'run_at', 'created')
+    list_filter = ('status', 'task')
+    readonly_fields = ('created',)
+
+
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'subject', 'to', 'status', 'attempts', 'run_at')
+    list_filter = ('status',)
+    search_fields = ('subject', 'to')
+    readonly_fields = ('created',)
+
+
+admin.site.register(Job, JobAdmin)
+admin.site.register(OutboxMessage, OutboxMessageAdmin)
@@ -0,0 +1,13 @@
+"""SQLite backend starting transactions with BEGIN IMMEDIATE.
+
+A deferred transaction that reads before it writes cannot wait for the
+lock: when another connection committed in between, SQLite fails it
+with "database is locked" at once, whatever busy_timeout says. Taking
+the write lock at BEGIN makes such writers queue up instead.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
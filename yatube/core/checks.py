@@ -0,0 +1,57 @@
+"""Templates must reference static files through {% static %}.
+
+Only {% static %} goes through the manifest of hashed names; a literal
+STATIC_URL path keeps pointing at the unhashed file, which the far
+future caching of the hashed ones never refreshes. A {% static %} name
+no finder knows breaks the page outright once the manifest is used.
+"""
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.checks import Error, Tags, register
+
+
+STATIC_TAG = re.compile(
+    r'{%\s*static\s+(?P<quote>[\'"])(?P<name>[^\'"]+)(?P=quote)')
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.xml')
+
+
+def _raw_static(static_url):
+    return re.compile(r'(?:href|src|url\()\s*=?\s*[\'"]?'
+                      + re.escape(static_url))
+
+
+def template_files():
+    dirs = [directory for directory in settings.TEMPLATES[0]['DIRS']
+            if directory != settings.COMPILED_TEMPLATES_DIR]
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for file_name in sorted(files):
+                if file_name.endswith(TEMPLATE_EXTENSIONS):
+                    yield os.path.join(root, file_name)
+
+
+@register(Tags.templates)
+def check_static_references(app_configs=None, **kwargs):
+    raw_static = _raw_static(settings.STATIC_URL)
+    errors = []
+    for path in template_files():
+        with open(path, encoding='utf-8') as template:
+            source = template.read()
+        for match in raw_static.finditer(source):
+            line = source.count('\n', 0, match.start()) + 1
+            errors.append(Error(
+                f'{path}:{line} links a static file by its URL.',
+                hint='Use {% static %} to get the hashed name.',
+                obj=path, id='core.E001'))
+        for match in STATIC_TAG.finditer(source):
+            if finders.find(match['name']) is None:
+                line = source.count('\n', 0, match.start()) + 1
+                errors.append(Error(
+                    f'{path}:{line} references the missing static file '
+                    f'{match["name"]}.',
+                    obj=path, id='core.E002'))
+    return errors
@@ -0,0 +1,130 @@
+"""Compression of the responses Django generates.
+
+core.middleware.CompressionMiddleware compresses a response with the
+first encoding of RESPONSE_COMPRESSION_ENCODINGS the client accepts;
+brotli needs the brotli package, gzip is always there. Responses
+smaller than RESPONSE_COMPRESSION_MIN_SIZE gain less than the header
+costs, already encoded ones (the precompressed static files) and
+types outside RESPONSE_COMPRESSION_TYPES (images) are passed through.
+Streaming responses are compressed chunk by chunk, each chunk flushed
+so that what the view sends early, such as the head of a streamed
+page, reaches the client early.
+"""
+import gzip
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class _GzipStream:
+    """zlib with the interface of brotli.Compressor."""
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED,
+                                            16 + zlib.MAX_WBITS)
+
+    def process(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def accepted_encodings(header):
+    """{coding: quality} of an Accept-Encoding header."""
+
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            accepted[coding.strip().lower()] = quality
+    return accepted
+
+
+def negotiate(header):
+    """The encoding to answer a request with, None for none."""
+
+    accepted = accepted_encodings(header)
+    for encoding in settings.RESPONSE_COMPRESSION_ENCODINGS:
+        quality = accepted.get(encoding, accepted.get('*', 0))
+        if encoding in available_encodings() and quality > 0:
+            return encoding
+    return None
+
+
+def compress(content, encoding):
+    level = settings.RESPONSE_COMPRESSION_LEVELS[encoding]
+    if encoding == 'br':
+        return brotli.compress(content, quality=level)
+    return gzip.compress(content, level, mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    level = settings.RESPONSE_COMPRESSION_LEVELS[encoding]
+    compressor = (brotli.Compressor(quality=level) if encoding == 'br'
+                  else _GzipStream(level))
+    for chunk in chunks:
+        # a flush without new data still costs a few bytes
+        if not chunk:
+            continue
+        yield compressor.process(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').split(';')[0].strip()
+    return (not response.has_header('Content-Encoding')
+            and content_type.startswith(settings.RESPONSE_COMPRESSION_TYPES)
+            and 'no-transform' not in response.get('Cache-Control', ''))
+
+
+def compress_response(request, response):
+    """Compresses the response in place when it is worth it."""
+
+    if not is_compressible(response):
+        return response
+    minimum = settings.RESPONSE_COMPRESSION_MIN_SIZE
+    if not response.streaming and len(response.content) < minimum:
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    if encoding is None:
+        return response
+    if response.streaming:
+        response.streaming_content = compress_stream(
+            response.streaming_content, encoding)
+        if response.has_header('Content-Length'):
+            del response['Content-Length']
+    else:
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+    # the compressed body is not byte for byte the one the ETag names
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response['ETag'] = 'W/' + etag
+    response['Content-Encoding'] = encoding
+    return response
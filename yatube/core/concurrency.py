@@ -0,0 +1,59 @@
+"""Runs independent queries of a request at the same time.
+
+Django 2.2 has neither async views nor an ASGI handler, so a view
+waiting on two unrelated queries hands one of them to a thread pool of
+CONCURRENT_QUERY_WORKERS threads instead. Each pool thread keeps its
+own database connections, closed like a request's according to
+CONN_MAX_AGE. Inside a transaction the queries run one after another:
+other connections would not see its uncommitted rows.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from . import routers
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        workers = settings.CONCURRENT_QUERY_WORKERS
+        if _pool is None or _pool._max_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ThreadPoolExecutor(workers,
+                                       thread_name_prefix='queries')
+        return _pool
+
+
+def _in_pool(function, replica):
+    """function run with the caller's database routing."""
+
+    def task():
+        close_old_connections()
+        try:
+            with routers.reading_from_replica() if replica else nullcontext():
+                return function()
+        finally:
+            close_old_connections()
+    return task
+
+
+def gather(*functions):
+    """Results of calling functions, all but the first in the pool."""
+
+    if (not settings.CONCURRENT_QUERY_WORKERS
+            or connection.in_atomic_block or len(functions) < 2):
+        return [function() for function in functions]
+    replica = routers.using_replica()
+    futures = [_executor().submit(_in_pool(function, replica))
+               for function in functions[1:]]
+    first = functions[0]()
+    return [first, *(future.result() for future in futures)]
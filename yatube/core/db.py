@@ -0,0 +1,34 @@
+import re
+
+from django.conf import settings
+
+
+PRAGMA_NAME = re.compile(r'^\w+$')
+
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created handler applying SQLITE_PRAGMAS.
+
+    The pragmas run on the raw connection, past execute_wrapper, so
+    they do not count against the queries of the request opening it.
+    The journal mode is stored in the database file and changing it
+    takes a lock, so it is only set when it differs.
+    """
+
+    if connection.vendor != 'sqlite':
+        return
+    raw = connection.connection
+    pragmas = dict(settings.SQLITE_PRAGMAS)
+    # wait for locks while setting the rest
+    if 'busy_timeout' in pragmas:
+        pragmas = {'busy_timeout': pragmas.pop('busy_timeout'), **pragmas}
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME.match(name) or not PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f'Bad SQLite pragma {name} = {value!r}')
+        if name == 'journal_mode':
+            current, = raw.execute('PRAGMA journal_mode').fetchone()
+            if current.lower() == str(value).lower():
+                continue
+        raw.execute(f'PRAGMA {name} = {value}')
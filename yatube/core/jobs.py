@@ -0,0 +1,152 @@
+"""Database-backed queue for work a request does not need to wait for.
+
+    @task
+    def fan_out_post(post_id):
+        ...
+
+    fan_out_post.delay(post_id=post.pk)
+
+delay() stores a Job row in the current transaction: the job commits
+or rolls back with the write that caused it, and no worker can pick it
+up before the rows it reads are visible. The run_jobs command claims
+due jobs and calls the tasks, each in a transaction of its own; a task
+raising is retried JOBS_MAX_ATTEMPTS times with exponential backoff.
+With JOBS_EAGER the job also runs in-process once the transaction
+commits, so development needs no worker.
+"""
+import json
+import logging
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+
+logger = logging.getLogger(__name__)
+
+
+def task(function=None, *, max_attempts=None, atomic=True):
+    """Gives function a delay(**kwargs) queueing a call of it and a
+    delay_until(run_at, **kwargs) queueing it for later.
+
+    The task is stored by its dotted path and kwargs as JSON, so it
+    must be a module level function taking JSON serializable kwargs.
+    Tasks waiting on the network pass atomic=False not to hold a
+    transaction open meanwhile; they must then leave consistent rows
+    behind when they fail half way.
+    """
+
+    def decorator(function):
+        name = f'{function.__module__}.{function.__qualname__}'
+        function.delay = partial(enqueue, name, max_attempts=max_attempts)
+        function.delay_until = partial(_enqueue_at, name, max_attempts)
+        function.atomic = atomic
+        return function
+
+    return decorator(function) if function is not None else decorator
+
+
+def _enqueue_at(name, max_attempts, run_at, **kwargs):
+    return enqueue(name, max_attempts=max_attempts, run_at=run_at, **kwargs)
+
+
+def enqueue(name, max_attempts=None, run_at=None, **kwargs):
+    job = Job.objects.create(
+        task=name,
+        kwargs=json.dumps(kwargs, cls=DjangoJSONEncoder),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        run_at=run_at or timezone.now())
+    if settings.JOBS_EAGER:
+        transaction.on_commit(partial(run_job, job.pk))
+    return job
+
+
+def _due(now):
+    return (Q(status=Job.QUEUED, run_at__lte=now)
+            | Q(status=Job.RUNNING, locked_until__lt=now))
+
+
+def _claim(job_id, now):
+    """Marks the job running if no other worker did, returns it or None."""
+
+    claimed = Job.objects.filter(_due(now), pk=job_id).update(
+        status=Job.RUNNING,
+        attempts=F('attempts') + 1,
+        locked_until=now + timedelta(seconds=settings.JOBS_TIMEOUT))
+    return Job.objects.get(pk=job_id) if claimed else None
+
+
+def claim_next():
+    """The oldest due job, claimed, or None when nothing is due."""
+
+    while True:
+        now = timezone.now()
+        job_id = (Job.objects.filter(_due(now)).order_by('run_at', 'id')
+                  .values_list('id', flat=True).first())
+        if job_id is None:
+            return None
+        job = _claim(job_id, now)
+        if job is not None:
+            return job
+
+
+def _run(job):
+    """Calls the task of a claimed job, True when it succeeded."""
+
+    try:
+        function = import_string(job.task)
+        with transaction.atomic() if function.atomic else nullcontext():
+            function(**json.loads(job.kwargs))
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error('Job %s failed for good:\n%s', job, error)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, locked_until=None, error=error)
+        else:
+            delay = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            logger.warning('Job %s failed, retry in %s s:\n%s',
+                           job, delay, error)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, locked_until=None, error=error,
+                run_at=timezone.now() + timedelta(seconds=delay))
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def run_job(job_id):
+    """Runs the job now unless a worker has already claimed it."""
+
+    job = _claim(job_id, timezone.now())
+    if job is not None:
+        return _run(job)
+    return None
+
+
+def run_pending(limit=None):
+    """Runs due jobs until none is left, returns (succeeded, failed)."""
+
+    results = {True: 0, False: 0}
+    while limit is None or sum(results.values()) < limit:
+        job = claim_next()
+        if job is None:
+            break
+        results[_run(job)] += 1
+    return results[True], results[False]
+
+
+def requeue_failed():
+    """Gives the failed jobs another JOBS_MAX_ATTEMPTS, returns how many."""
+
+    return Job.objects.filter(status=Job.FAILED).update(
+        status=Job.QUEUED, attempts=0, run_at=timezone.now())
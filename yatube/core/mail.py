@@ -0,0 +1,174 @@
+"""Email sent from requests is stored and delivered by a job.
+
+EMAIL_BACKEND is OutboxBackend: send_mail() and the auth views only
+write OutboxMessage rows, in the request's transaction, and queue the
+deliver task. deliver() sends every due message in batches of
+EMAIL_OUTBOX_BATCH_SIZE over a single connection of
+EMAIL_DELIVERY_BACKEND, the backend actually talking to the mail
+server. A message the server refuses is retried on its own with
+exponential backoff, EMAIL_OUTBOX_MAX_ATTEMPTS times.
+"""
+import json
+import logging
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import F, Min, Q
+from django.utils import timezone
+
+from .jobs import task
+from .models import Job, OutboxMessage
+
+
+logger = logging.getLogger(__name__)
+
+
+def _delivery_connection():
+    return get_connection(settings.EMAIL_DELIVERY_BACKEND)
+
+
+def serialize(message):
+    return json.dumps({
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'content_subtype': message.content_subtype,
+    })
+
+
+def deserialize(raw, connection=None):
+    fields = json.loads(raw)
+    content_subtype = fields.pop('content_subtype')
+    fields['alternatives'] = [tuple(alternative)
+                              for alternative in fields['alternatives']]
+    message = EmailMultiAlternatives(connection=connection, **fields)
+    message.content_subtype = content_subtype
+    return message
+
+
+class OutboxBackend(BaseEmailBackend):
+    """Stores the messages for deliver().
+
+    Messages with attachments are not stored, they go straight to
+    EMAIL_DELIVERY_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        queued = [message for message in email_messages
+                  if not message.attachments]
+        direct = [message for message in email_messages
+                  if message.attachments]
+        if direct:
+            _delivery_connection().send_messages(direct)
+        if queued:
+            OutboxMessage.objects.bulk_create(
+                OutboxMessage(subject=message.subject[:255],
+                              to=', '.join(message.recipients()),
+                              message=serialize(message))
+                for message in queued)
+            # a run finding nothing left to send costs one query
+            deliver.delay()
+        return len(email_messages)
+
+
+def _due(now):
+    return (Q(status=OutboxMessage.QUEUED, run_at__lte=now)
+            | Q(status=OutboxMessage.SENDING, locked_until__lt=now))
+
+
+def _claim_batch():
+    """Claims due messages, None when nothing is due.
+
+    The batch may come back empty when another worker took the same
+    messages first.
+    """
+
+    now = timezone.now()
+    ids = list(OutboxMessage.objects.filter(_due(now))
+               .order_by('run_at', 'id')
+               .values_list('id', flat=True)
+               [:settings.EMAIL_OUTBOX_BATCH_SIZE])
+    if not ids:
+        return None
+    claim = uuid.uuid4().hex
+    OutboxMessage.objects.filter(_due(now), pk__in=ids).update(
+        status=OutboxMessage.SENDING,
+        claim=claim,
+        attempts=F('attempts') + 1,
+        locked_until=now + timedelta(seconds=settings.JOBS_TIMEOUT))
+    return list(OutboxMessage.objects.filter(claim=claim))
+
+
+def _failed(outbox_message, error):
+    if outbox_message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        logger.error('Giving up on email %s: %r', outbox_message, error)
+        changes = {'status': OutboxMessage.FAILED}
+    else:
+        delay = (settings.EMAIL_OUTBOX_RETRY_DELAY
+                 * 2 ** (outbox_message.attempts - 1))
+        logger.warning('Email %s failed, retry in %s s: %r',
+                       outbox_message, delay, error)
+        changes = {'status': OutboxMessage.QUEUED,
+                   'run_at': timezone.now() + timedelta(seconds=delay)}
+    OutboxMessage.objects.filter(pk=outbox_message.pk).update(
+        locked_until=None, claim='', error=repr(error), **changes)
+
+
+def _schedule_retry():
+    """Queues a delivery for the earliest message waiting to be retried."""
+
+    run_at = (OutboxMessage.objects.filter(status=OutboxMessage.QUEUED)
+              .aggregate(run_at=Min('run_at'))['run_at'])
+    if run_at is None:
+        return
+    name = f'{deliver.__module__}.{deliver.__qualname__}'
+    if not Job.objects.filter(task=name, status=Job.QUEUED,
+                              run_at__lte=run_at).exists():
+        deliver.delay_until(run_at)
+
+
+@task(atomic=False)
+def deliver():
+    """Sends the due messages, returns (sent, failed)."""
+
+    sent = failed = 0
+    connection = None
+    try:
+        while True:
+            batch = _claim_batch()
+            if batch is None:
+                break
+            delivered = []
+            for outbox_message in batch:
+                try:
+                    if connection is None:
+                        connection = _delivery_connection()
+                        connection.open()
+                    connection.send_messages(
+                        [deserialize(outbox_message.message, connection)])
+                except Exception as error:
+                    _failed(outbox_message, error)
+                    failed += 1
+                    # the connection may be broken, the next message
+                    # opens a new one
+                    if connection is not None:
+                        connection.close()
+                        connection = None
+                else:
+                    delivered.append(outbox_message.pk)
+            OutboxMessage.objects.filter(pk__in=delivered).delete()
+            sent += len(delivered)
+    finally:
+        if connection is not None:
+            connection.close()
+    _schedule_retry()
+    return sent, failed
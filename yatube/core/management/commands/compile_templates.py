@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import templatebuild
+
+
+class Command(BaseCommand):
+    help = ('Writes COMPILED_TEMPLATES with their includes inlined to '
+            'COMPILED_TEMPLATES_DIR, which production settings search '
+            'first. Run it again after editing the templates.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*',
+                            help='Templates to compile instead of '
+                                 'COMPILED_TEMPLATES.')
+        parser.add_argument('--output',
+                            default=settings.COMPILED_TEMPLATES_DIR)
+
+    def handle(self, *args, **options):
+        names = options['names'] or settings.COMPILED_TEMPLATES
+        for path in templatebuild.build(names, options['output']):
+            self.stdout.write(f'Compiled {path}')
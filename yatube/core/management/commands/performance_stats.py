@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from core import performance
+
+
+class Command(BaseCommand):
+    help = ('Shows request timings per URL name collected by '
+            'PerformanceMiddleware over the kept windows.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', action='store_true',
+                            help='Print the histograms as JSON.')
+        parser.add_argument('--reset', action='store_true',
+                            help='Drop the collected timings after '
+                                 'printing them.')
+
+    def handle(self, *args, **options):
+        stats = performance.stats(reset=options['reset'])
+        if options['json']:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{"view":28} {"n":>6} {"avg ms":>8} {"p95 ms":>7} '
+            f'{"db ms":>7} {"queries":>7} {"tpl ms":>7} {"hits":>5}'))
+        for name, row in stats.items():
+            p95 = row['p95_ms']
+            if p95 is None:
+                p95 = f'>{performance.BUCKETS_MS[-1]}'
+            self.stdout.write(
+                f'{name:28} {row["requests"]:6} {row["avg_ms"]:8.2f} '
+                f'{p95:>7} {row["db_ms"]:7.2f} {row["db_queries"]:7.1f} '
+                f'{row["template_ms"]:7.2f} {row["cache_hits"]:5.1f}')
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import jobs
+
+
+class Command(BaseCommand):
+    help = ('Runs queued background jobs, polling for new ones until '
+            'interrupted, or with --once until the queue is drained.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when no job is due.')
+        parser.add_argument('--interval', type=float, default=1,
+                            help='Seconds to wait when no job is due.')
+        parser.add_argument('--requeue-failed', action='store_true',
+                            help='Queue the failed jobs again first.')
+
+    def handle(self, *args, **options):
+        if options['requeue_failed']:
+            self.stdout.write(f'{jobs.requeue_failed()} failed jobs '
+                              f'queued again.')
+        succeeded = failed = 0
+        try:
+            while True:
+                close_old_connections()
+                done, errors = jobs.run_pending()
+                succeeded += done
+                failed += errors
+                if options['once']:
+                    break
+                if not done + errors:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            close_old_connections()
+        self.stdout.write(self.style.SUCCESS(
+            f'{succeeded} jobs done, {failed} attempts failed.'))
@@ -0,0 +1,96 @@
+from django.conf import settings
+
+from . import compression, performance, querylog
+
+
+class PerformanceMiddleware:
+    """Records timings of sampled requests per URL name.
+
+    Sampled responses carry them in a Server-Timing header when
+    PERFORMANCE_SERVER_TIMING is on. A streaming response is timed
+    until its body is sent; its headers leave before that, so it gets
+    no Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        performance.instrument_templates()
+
+    def __call__(self, request):
+        if not performance.sampled():
+            return self.get_response(request)
+        recorder = performance.Recorder()
+        with recorder:
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = self.record_stream(
+                request, recorder, response.streaming_content)
+            return response
+        view_name = self.record(request, recorder)
+        if settings.PERFORMANCE_SERVER_TIMING:
+            response['Server-Timing'] = recorder.server_timing(view_name)
+        return response
+
+    def record_stream(self, request, recorder, content):
+        with recorder:
+            yield from content
+        self.record(request, recorder)
+
+    @staticmethod
+    def record(request, recorder):
+        match = request.resolver_match
+        view_name = match.view_name if match is not None else 'unresolved'
+        performance.record(view_name, recorder)
+        return view_name
+
+
+class CompressionMiddleware:
+    """Compresses the responses, see core.compression."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return compression.compress_response(request, response)
+
+
+class QueryInspectionMiddleware:
+    """Logs slow queries and N+1 suspects per request when
+    QUERY_INSPECTION is on, and checks the query budgets of views
+    declared with core.querylog.query_budget.
+
+    The queries of a streaming response count until its body is sent.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.QUERY_INSPECTION:
+            return self.get_response(request)
+        inspector = querylog.QueryInspector(request.path)
+        with inspector:
+            response = self.get_response(request)
+        if response.streaming:
+            response.streaming_content = self.inspect_stream(
+                request, inspector, response.streaming_content)
+        else:
+            self.report(request, inspector)
+        return response
+
+    def inspect_stream(self, request, inspector, content):
+        with inspector:
+            yield from content
+        self.report(request, inspector)
+
+    @staticmethod
+    def report(request, inspector):
+        match = request.resolver_match
+        if match is not None:
+            inspector.name = match.view_name
+        inspector.report(getattr(request, '_query_budget', None))
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if settings.QUERY_INSPECTION:
+            request._query_budget = getattr(view_func, 'query_budget', None)
@@ -0,0 +1,40 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True,
+                                        serialize=False, verbose_name='ID')),
+                ('task', models.CharField(max_length=200)),
+                ('kwargs', models.TextField(default='{}')),
+                ('status', models.CharField(
+                    choices=[('queued', 'В очереди'),
+                             ('running', 'Выполняется'),
+                             ('failed', 'Ошибка')],
+                    default='queued', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('max_attempts', models.PositiveIntegerField()),
+                ('run_at', models.DateTimeField(
+                    default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True,
+                                                      null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('error', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'run_at'],
+                               name='job_status_run_at_idx'),
+        ),
+    ]
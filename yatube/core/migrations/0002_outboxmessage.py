@@ -0,0 +1,40 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxMessage',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True,
+                                        serialize=False, verbose_name='ID')),
+                ('subject', models.CharField(max_length=255)),
+                ('to', models.TextField()),
+                ('message', models.TextField()),
+                ('status', models.CharField(
+                    choices=[('queued', 'В очереди'),
+                             ('sending', 'Отправляется'),
+                             ('failed', 'Ошибка')],
+                    default='queued', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('run_at', models.DateTimeField(
+                    default=django.utils.timezone.now)),
+                ('locked_until', models.DateTimeField(blank=True,
+                                                      null=True)),
+                ('claim', models.CharField(blank=True, max_length=32)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('error', models.TextField(blank=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='outboxmessage',
+            index=models.Index(fields=['status', 'run_at'],
+                               name='outbox_status_run_at_idx'),
+        ),
+    ]
@@ -0,0 +1,79 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A call of a core.jobs task waiting for the run_jobs worker.
+
+    Finished jobs are deleted, failed ones are kept with the traceback
+    of their last attempt.
+    """
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    task = models.CharField(max_length=200)
+    kwargs = models.TextField(default='{}')
+    status = models.CharField(max_length=10, choices=STATUSES,
+                              default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField()
+    run_at = models.DateTimeField(default=timezone.now)
+    # a running job whose worker died is claimed again after this
+    locked_until = models.DateTimeField(blank=True, null=True)
+    created = models.DateTimeField(auto_now_add=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('status', 'run_at'),
+                         name='job_status_run_at_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.task} #{self.pk} ({self.status})'
+
+
+class OutboxMessage(models.Model):
+    """An email stored by core.mail.OutboxBackend until it is delivered.
+
+    message holds the EmailMessage fields as JSON. Delivered messages
+    are deleted, failed ones are kept with the last error.
+    """
+
+    QUEUED = 'queued'
+    SENDING = 'sending'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (SENDING, 'Отправляется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    subject = models.CharField(max_length=255)
+    to = models.TextField()
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUSES,
+                              default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(blank=True, null=True)
+    # marks the messages one delivery run has claimed
+    claim = models.CharField(max_length=32, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('status', 'run_at'),
+                         name='outbox_status_run_at_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.subject} -> {self.to}'
@@ -0,0 +1,244 @@
+"""Per-request timings aggregated into rolling histograms per URL name.
+
+A Recorder collects the numbers of a sampled request: database queries
+through connection.execute_wrapper, template rendering through the
+Django template backend and counters reported with count(), of which
+those named *_hits are cache hits. Finished requests are added to the
+cache in windows of PERFORMANCE_WINDOW_SECONDS, the last
+PERFORMANCE_WINDOWS of which make up the histograms. Requests left
+out by sampling pay for one random() call.
+"""
+import random
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.template.backends import django as django_backend
+
+
+# Upper bounds in milliseconds of the latency buckets
+BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Sums are kept in microseconds, cache.incr() only adds integers
+FIELDS = ('requests', 'total_us', 'db_us', 'db_queries', 'template_us',
+          'cache_hits', *(f'le_{bound}' for bound in BUCKETS_MS), 'le_inf')
+
+NAMES_KEY = 'performance:names'
+
+_local = threading.local()
+
+
+def _cache():
+    return caches[settings.PERFORMANCE_CACHE]
+
+
+def current():
+    """The recorder of the request being sampled on this thread."""
+
+    return getattr(_local, 'recorder', None)
+
+
+def count(name, amount=1):
+    """Adds to a counter of the sampled request, if there is one."""
+
+    recorder = current()
+    if recorder is not None:
+        recorder.counters[name] = recorder.counters.get(name, 0) + amount
+
+
+def sampled():
+    rate = settings.PERFORMANCE_SAMPLE_RATE
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+
+class Recorder:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.total = None
+        self.db_time = 0.0
+        self.db_queries = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.counters = {}
+
+    def __enter__(self):
+        _local.recorder = self
+        self._wrappers = ExitStack()
+        for connection in connections.all():
+            self._wrappers.enter_context(
+                connection.execute_wrapper(self.time_query))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrappers.close()
+        _local.recorder = None
+        self.total = time.perf_counter() - self.start
+
+    def time_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.db_queries += 1
+
+    def server_timing(self, view_name):
+        """The Server-Timing header value, durations in milliseconds."""
+
+        metrics = [
+            f'view;desc="{view_name}"',
+            f'db;dur={self.db_time * 1000:.1f};'
+            f'desc="{self.db_queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+        ]
+        metrics.extend(f'{name};desc="{value}"'
+                       for name, value in sorted(self.counters.items()))
+        metrics.append(f'total;dur={self.total * 1000:.1f}')
+        return ', '.join(metrics)
+
+
+@contextmanager
+def timing_templates():
+    """Adds the time of the block to the template time of the sampled
+    request; nested blocks, included templates, count once."""
+
+    recorder = current()
+    if recorder is None:
+        yield
+        return
+    recorder.template_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.template_depth -= 1
+        if not recorder.template_depth:
+            recorder.template_time += time.perf_counter() - start
+
+
+def _render(render):
+    """Times the outermost template render, included ones are inside."""
+
+    def timed_render(self, context=None, request=None):
+        with timing_templates():
+            return render(self, context, request)
+
+    timed_render.instrumented = True
+    return timed_render
+
+
+def instrument_templates():
+    template = django_backend.Template
+    if not getattr(template.render, 'instrumented', False):
+        template.render = _render(template.render)
+
+
+def _window():
+    return int(time.time() // settings.PERFORMANCE_WINDOW_SECONDS)
+
+
+def _key(name, window, field):
+    return f'performance:{name}:{window}:{field}'
+
+
+def _incr(key, amount, timeout):
+    """Adds amount to key, returning whether the key was just created."""
+
+    cache = _cache()
+    created = cache.add(key, 0, timeout)
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # evicted between add() and incr()
+        cache.set(key, amount, timeout)
+    return created
+
+
+def _register(name):
+    names = _cache().get(NAMES_KEY, set())
+    if name not in names:
+        _cache().set(NAMES_KEY, names | {name}, None)
+
+
+def record(name, recorder):
+    """Adds a finished request to the current window of name."""
+
+    milliseconds = recorder.total * 1000
+    bucket = next((f'le_{bound}' for bound in BUCKETS_MS
+                   if milliseconds <= bound), 'le_inf')
+    values = {
+        'requests': 1,
+        'total_us': int(recorder.total * 1e6),
+        'db_us': int(recorder.db_time * 1e6),
+        'db_queries': recorder.db_queries,
+        'template_us': int(recorder.template_time * 1e6),
+        'cache_hits': sum(value for counter, value
+                          in recorder.counters.items()
+                          if counter.endswith('_hits')),
+        bucket: 1,
+    }
+    window = _window()
+    timeout = (settings.PERFORMANCE_WINDOW_SECONDS
+               * settings.PERFORMANCE_WINDOWS)
+    for field, amount in values.items():
+        if not amount:
+            continue
+        created = _incr(_key(name, window, field), amount, timeout)
+        # the list of names is only read once per window
+        if created and field == 'requests':
+            _register(name)
+
+
+def _percentile(histogram, requests, percent):
+    """Upper bound of the bucket holding the percentile, None if over."""
+
+    seen = 0
+    for bound in (*BUCKETS_MS, 'inf'):
+        seen += histogram[f'le_{bound}']
+        if seen >= requests * percent / 100:
+            return None if bound == 'inf' else bound
+    return None
+
+
+def _all_keys(names):
+    last = _window()
+    windows = range(last - settings.PERFORMANCE_WINDOWS + 1, last + 1)
+    return {name: [_key(name, window, field)
+                   for window in windows for field in FIELDS]
+            for name in names}
+
+
+def stats(reset=False):
+    """Aggregates the kept windows into a summary per URL name."""
+
+    names = sorted(_cache().get(NAMES_KEY, set()))
+    keys = _all_keys(names)
+    values = _cache().get_many([key for name in names for key in keys[name]])
+    result = {}
+    for name in names:
+        totals = dict.fromkeys(FIELDS, 0)
+        for key in keys[name]:
+            totals[key.rsplit(':', 1)[1]] += values.get(key, 0)
+        requests = totals['requests']
+        if not requests:
+            continue
+        result[name] = {
+            'requests': requests,
+            'avg_ms': round(totals['total_us'] / requests / 1000, 2),
+            'p50_ms': _percentile(totals, requests, 50),
+            'p95_ms': _percentile(totals, requests, 95),
+            'p99_ms': _percentile(totals, requests, 99),
+            'db_ms': round(totals['db_us'] / requests / 1000, 2),
+            'db_queries': round(totals['db_queries'] / requests, 2),
+            'template_ms': round(totals['template_us'] / requests / 1000, 2),
+            'cache_hits': round(totals['cache_hits'] / requests, 2),
+            'histogram': {f'<={bound}ms': totals[f'le_{bound}']
+                          for bound in BUCKETS_MS},
+        }
+        result[name]['histogram']['slower'] = totals['le_inf']
+    if reset:
+        _cache().delete_many([key for name in names for key in keys[name]])
+    return result
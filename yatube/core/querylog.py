@@ -0,0 +1,134 @@
+"""Slow query log, N+1 detection and query budgets of views.
+
+Meant for development and tests: every query is fingerprinted, queries
+of the same shape repeated within one request are reported as N+1
+suspects together with the templates and project code that issued
+them, and queries slower than SLOW_QUERY_MS are logged.
+"""
+import inspect
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Node
+
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def fingerprint(sql):
+    """The shape of a query: literals, parameters and IN lists elided."""
+
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def query_budget(queries):
+    """Declares the most queries a view may run per request."""
+
+    def decorator(view):
+        view.query_budget = queries
+        return view
+    return decorator
+
+
+def _is_project_file(filename):
+    filename = os.path.abspath(filename)
+    return (filename.startswith(settings.BASE_DIR)
+            and 'site-packages' not in filename
+            and not filename.startswith(os.path.dirname(__file__)))
+
+
+def origin_stack():
+    """Template lines and project code on the way to the current query."""
+
+    stack = []
+    frame = inspect.currentframe().f_back
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        if isinstance(node, Node) and getattr(node, 'token', None):
+            origin = getattr(node, 'origin', None)
+            entry = (f'{getattr(origin, "template_name", origin)}:'
+                     f'{node.token.lineno} {node.token.contents[:40]}')
+            if not stack or stack[-1] != entry:
+                stack.append(entry)
+        elif _is_project_file(frame.f_code.co_filename):
+            stack.append(f'{os.path.relpath(frame.f_code.co_filename)}:'
+                         f'{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return stack
+
+
+class QueryInspector:
+    """Watches the queries run inside the with block on all connections."""
+
+    def __init__(self, name):
+        self.name = name
+        self.queries = 0
+        self.shapes = Counter()
+        self.stacks = {}
+        self.slow = []
+
+    def __enter__(self):
+        self._wrappers = ExitStack()
+        for connection in connections.all():
+            self._wrappers.enter_context(
+                connection.execute_wrapper(self.inspect))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._wrappers.close()
+
+    def inspect(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            milliseconds = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            shape = fingerprint(sql)
+            self.shapes[shape] += 1
+            # the stack of the repeat that makes it a suspect is kept
+            if self.shapes[shape] == settings.N_PLUS_ONE_THRESHOLD:
+                self.stacks[shape] = origin_stack()
+            if milliseconds >= settings.SLOW_QUERY_MS:
+                self.slow.append((milliseconds, sql, params))
+
+    def suspects(self):
+        """(shape, times run, stack) of the N+1 suspects."""
+
+        return [(shape, times, self.stacks[shape])
+                for shape, times in self.shapes.most_common()
+                if times >= settings.N_PLUS_ONE_THRESHOLD]
+
+    def report(self, budget=None):
+        for milliseconds, sql, params in self.slow:
+            logger.warning('Slow query in %s (%.1f ms): %s; params %r',
+                           self.name, milliseconds, sql, params)
+        for shape, times, stack in self.suspects():
+            logger.warning(
+                'Possible N+1 in %s, query run %d times: %s\n  %s',
+                self.name, times, shape, '\n  '.join(stack))
+        if budget is not None and self.queries > budget:
+            message = (f'{self.name} ran {self.queries} queries, '
+                       f'its budget is {budget}')
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.error(message)
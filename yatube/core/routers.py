@@ -0,0 +1,70 @@
+"""Sends the reads of feed listings to a read replica.
+
+Views opt in with @replica_reads; everything else, and every write,
+goes to default. A user who has just written keeps reading from
+default for REPLICA_STICKY_SECONDS so their own change does not
+disappear while the replica catches up.
+"""
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+_state = threading.local()
+
+
+def _sticky_key(user_id):
+    return f'replica_sticky:{user_id}'
+
+
+def stick_to_primary(user_id):
+    cache.set(_sticky_key(user_id), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def is_sticky(user_id):
+    return cache.get(_sticky_key(user_id), False)
+
+
+def using_replica():
+    return getattr(_state, 'replica', False)
+
+
+@contextmanager
+def reading_from_replica():
+    previous = getattr(_state, 'replica', False)
+    _state.replica = True
+    try:
+        yield
+    finally:
+        _state.replica = previous
+
+
+def replica_reads(view):
+    """Runs the view's reads on READ_REPLICA unless the user is sticky."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        user = request.user
+        if (settings.READ_REPLICA is None
+                or user.is_authenticated and is_sticky(user.pk)):
+            return view(request, *args, **kwargs)
+        with reading_from_replica():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if using_replica():
+            return settings.READ_REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # the replica holds the same rows as default
+        return True
@@ -0,0 +1,180 @@
+"""Static files built for far-future caching.
+
+STATIC_BUNDLES concatenates stylesheets into one file per bundle, so
+a page loads a single stylesheet; BundleFinder writes the bundles to
+STATIC_BUNDLES_DIR, where runserver and collectstatic find them like
+any other static file. CompressedManifestStorage, the storage of the
+prod profile, names the collected files after their content hash and
+stores gzip and, with the brotli package, brotli variants next to them.
+serve() answers with a variant the client accepts and lets hashed
+names be cached for STATIC_MAX_AGE: their content never changes.
+"""
+import gzip
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.finders import BaseFinder
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.map')
+
+# Smaller files gain less than the Content-Encoding header costs
+MIN_COMPRESS_SIZE = 256
+
+# name.<12 hex digits of the md5>.ext, see HashedFilesMixin.hashed_name
+HASHED_NAME = re.compile(r'^(?P<base>.+)\.[0-9a-f]{12}(?P<ext>\.[^./]+)?$')
+
+# (encoding, file suffix) in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _source_path(name):
+    path = finders.find(name)
+    if path is None:
+        raise FileNotFoundError(f'{name} of a static bundle is missing')
+    return path
+
+
+def build_bundle(name, sources, output_dir):
+    """Writes the bundle unless it is newer than its sources."""
+
+    paths = [_source_path(source) for source in sources]
+    target = os.path.join(output_dir, name)
+    if (os.path.exists(target) and os.path.getmtime(target)
+            >= max(os.path.getmtime(path) for path in paths)):
+        return target
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target + '.tmp', 'wb') as bundle:
+        for source, path in zip(sources, paths):
+            bundle.write(f'/* {source} */\n'.encode())
+            with open(path, 'rb') as source_file:
+                bundle.write(source_file.read())
+            bundle.write(b'\n')
+    os.replace(target + '.tmp', target)
+    return target
+
+
+class BundleFinder(BaseFinder):
+    """Finds the STATIC_BUNDLES, built from the other finders' files."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.storage = FileSystemStorage(location=settings.STATIC_BUNDLES_DIR)
+
+    def find(self, path, all=False):
+        sources = settings.STATIC_BUNDLES.get(path)
+        if sources is None:
+            return []
+        target = build_bundle(path, sources, settings.STATIC_BUNDLES_DIR)
+        return [target] if all else target
+
+    def list(self, ignore_patterns):
+        for name, sources in settings.STATIC_BUNDLES.items():
+            build_bundle(name, sources, settings.STATIC_BUNDLES_DIR)
+            yield name, self.storage
+
+
+def compress(content):
+    """{suffix: compressed bytes} of the variants worth keeping."""
+
+    variants = {'.gz': gzip.compress(content, 9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+    return {suffix: compressed for suffix, compressed in variants.items()
+            if len(compressed) < len(content)}
+
+
+class CompressedManifestStorage(ManifestStaticFilesStorage):
+    """Hashed file names plus precompressed variants of text files."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        processed = super().post_process(paths, dry_run, **options)
+        for name, hashed_name, result in processed:
+            yield name, hashed_name, result
+            if dry_run or isinstance(result, Exception):
+                continue
+            targets = [name]
+            if hashed_name:
+                targets.append(hashed_name)
+            for target in targets:
+                self._compress(target)
+
+    def _compress(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for suffix, compressed in compress(content).items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+
+
+def is_hashed(name):
+    """Whether name is the hashed name the manifest gives a file."""
+
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', None)
+    match = HASHED_NAME.match(name)
+    if not hashed_files or match is None:
+        return False
+    return hashed_files.get(match['base'] + (match['ext'] or '')) == name
+
+
+def serve(request, path):
+    """Serves a collected static file, precompressed when possible."""
+
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404('No such static file.')
+    if not os.path.isfile(full_path):
+        raise Http404('No such static file.')
+    content_type, _ = mimetypes.guess_type(full_path)
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encoding = None
+    for candidate, suffix in ENCODINGS:
+        if candidate in accepted and os.path.isfile(full_path + suffix):
+            encoding = candidate
+            full_path += suffix
+            break
+    stat = os.stat(full_path)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'),
+                              stat.st_mtime, stat.st_size):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(
+            open(full_path, 'rb'),
+            content_type=content_type or 'application/octet-stream')
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    if is_hashed(name):
+        patch_cache_control(response, public=True, immutable=True,
+                            max_age=settings.STATIC_MAX_AGE)
+    else:
+        patch_cache_control(response, public=True,
+                            max_age=settings.STATIC_UNHASHED_MAX_AGE)
+    return response
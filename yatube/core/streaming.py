@@ -0,0 +1,101 @@
+"""Pages sent while they are rendered.
+
+render() builds the whole page before its first byte leaves. stream()
+renders the outermost template node by node and sends everything
+before {% block content %}, the <head> with the stylesheet and the
+site header, as soon as it is rendered: the browser fetches the
+stylesheet while the content is rendered. Values of the context
+wrapped in SimpleLazyObject, such as the page of posts, are read only
+when the content block uses them.
+
+Status and headers leave with the first chunk, so whatever decides
+them, a missing group giving 404 for one, is looked up before
+streaming; an error in the content block cuts the page short.
+"""
+from contextlib import nullcontext
+
+from django.http import StreamingHttpResponse
+from django.template import loader
+from django.template.base import TextNode
+from django.template.context import make_context
+from django.template.loader_tags import (BLOCK_CONTEXT_KEY, BlockContext,
+                                         BlockNode, ExtendsNode)
+
+from .performance import timing_templates
+from .routers import reading_from_replica, using_replica
+
+
+# Block of base.html the chunk before it is sent ahead of
+FLUSH_BEFORE = 'content'
+
+_FLUSH = None
+
+
+def _parent_nodes(extends_node, context):
+    """The nodes of the parent template, set up as ExtendsNode.render
+    does it."""
+
+    parent = extends_node.get_parent(context)
+    if BLOCK_CONTEXT_KEY not in context.render_context:
+        context.render_context[BLOCK_CONTEXT_KEY] = BlockContext()
+    block_context = context.render_context[BLOCK_CONTEXT_KEY]
+    block_context.add_blocks(extends_node.blocks)
+    for node in parent.nodelist:
+        if not isinstance(node, TextNode):
+            if not isinstance(node, ExtendsNode):
+                block_context.add_blocks({
+                    block.name: block for block
+                    in parent.nodelist.get_nodes_by_type(BlockNode)})
+            break
+    with context.render_context.push_state(parent, isolated_context=False):
+        yield from _nodes(parent, context)
+
+
+def _nodes(template, context):
+    """Output of the top level nodes, _FLUSH before the flushed block."""
+
+    for node in template.nodelist:
+        if isinstance(node, ExtendsNode):
+            yield from _parent_nodes(node, context)
+            continue
+        if isinstance(node, BlockNode) and node.name == FLUSH_BEFORE:
+            yield _FLUSH
+        yield node.render_annotated(context)
+
+
+def _chunks(template, context):
+    pieces = []
+    for piece in _nodes(template, context):
+        if piece is _FLUSH:
+            yield ''.join(pieces)
+            pieces = []
+        else:
+            pieces.append(piece)
+    yield ''.join(pieces)
+
+
+def stream(request, template_name, context=None):
+    """Like render(), with the head of the page sent first."""
+
+    template = loader.get_template(template_name).template
+    context = make_context(context, request,
+                           autoescape=template.engine.autoescape)
+    # the body is rendered after the view has returned
+    replica = using_replica()
+
+    def chunks():
+        with reading_from_replica() if replica else nullcontext(), \
+                context.render_context.push_state(template), \
+                context.bind_template(template):
+            context.template_name = template.name
+            pieces = _chunks(template, context)
+            while True:
+                # the time the client takes to read a chunk is not
+                # rendering
+                with timing_templates():
+                    chunk = next(pieces, None)
+                if chunk is None:
+                    break
+                yield chunk
+
+    return StreamingHttpResponse(chunks())
@@ -0,0 +1,78 @@
+"""Build step inlining {% include %} tags into the including template.
+
+Feeds include a few small partials for every post; each include is
+looked up and rendered in a context of its own on every iteration.
+compile_template() replaces includes of literal template names with
+the included source, recursively, so the compiled template renders the
+same page from a single node list. Includes that cannot be inlined
+without changing their meaning, with "only", of variable names or of
+templates extending another, are kept.
+"""
+import os
+import re
+
+from django.conf import settings
+from django.template import Engine, TemplateDoesNotExist
+
+
+INCLUDE = re.compile(
+    r'{%\s*include\s+(?P<quote>[\'"])(?P<name>[^\'"]+)(?P=quote)'
+    r'(?:\s+with\s+(?P<extra>.*?))?(?P<only>\s+only)?\s*%}')
+
+EXTENDS = re.compile(r'{%\s*extends\s')
+
+MAX_DEPTH = 10
+
+
+def source_engine():
+    """An engine seeing the templates as written, not the compiled ones."""
+
+    options = settings.TEMPLATES[0]
+    dirs = [directory for directory in options['DIRS']
+            if directory != settings.COMPILED_TEMPLATES_DIR]
+    return Engine(dirs=dirs, loaders=settings.TEMPLATE_LOADERS)
+
+
+def template_source(engine, name):
+    """The raw source of name, found like the engine would find it."""
+
+    for loader in engine.template_loaders:
+        for origin in loader.get_template_sources(name):
+            try:
+                return loader.get_contents(origin)
+            except TemplateDoesNotExist:
+                continue
+    raise TemplateDoesNotExist(name)
+
+
+def compile_template(engine, name, depth=0):
+    """Source of name with its literal includes inlined."""
+
+    if depth > MAX_DEPTH:
+        raise RecursionError(f'{name} includes itself')
+
+    def inline(match):
+        if match['only']:
+            return match[0]
+        source = compile_template(engine, match['name'], depth + 1)
+        if EXTENDS.search(source):
+            return match[0]
+        if match['extra']:
+            return f'{{% with {match["extra"]} %}}{source}{{% endwith %}}'
+        return source
+
+    return INCLUDE.sub(inline, template_source(engine, name))
+
+
+def build(names, output_dir):
+    """Writes the compiled templates under output_dir, returns paths."""
+
+    engine = source_engine()
+    paths = []
+    for name in names:
+        path = os.path.join(output_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as compiled:
+            compiled.write(compile_template(engine, name))
+        paths.append(path)
+    return paths
@@ -19,11 +19,11 @@ def addmethod(access):
         action_url = ''
     if access == 'login':
         return format_html(
-            '<form method="post" '
+            '<form method="post" enctype="multipart/form-data" '
             'action="{}">', action_url
         )
     return format_html(
-        '<form method="post" '
+        '<form method="post" enctype="multipart/form-data" '
         'action="{}">', action_url
     )
 
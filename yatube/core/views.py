@@ -0,0 +1,11 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from . import performance
+
+
+@staff_member_required
+def performance_stats(request):
+    """Request timings per URL name over the kept windows, for staff."""
+
+    return JsonResponse(performance.stats(reset='reset' in request.GET))
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.conf import settings
 
-from .models import Post, Group
+from . import search
+from .models import Follow, Post, Group
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -11,6 +12,11 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ('pub_date',)
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search.is_available():
+            return super().get_search_results(request, queryset, search_term)
+        return search.filter_posts(queryset, search_term), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'title', 'slug', 'description')
@@ -18,5 +24,13 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = settings.EMPTY_VALUE_DISPLAY
 
 
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author', 'fan_out_on_read')
+    search_fields = ('user__username', 'author__username')
+    list_filter = ('fan_out_on_read',)
+    raw_id_fields = ('user', 'author')
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
+admin.site.register(Follow, FollowAdmin)
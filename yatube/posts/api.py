@@ -0,0 +1,138 @@
+"""Read-only JSON mirror of the feeds and the post page.
+
+Rows are read with .values() and serialized straight from the dicts,
+no model instances are built.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from . import counters
+from .models import Group, Post, User
+from .paginators import CursorPaginator
+from core.querylog import query_budget
+from yatube.settings import POSTS_PER_PAGE
+
+
+# Public field name -> lookup of the value
+FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+}
+
+MAX_LIMIT = 100
+
+encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+class ValuesCursorPaginator(CursorPaginator):
+    """CursorPaginator over .values() rows."""
+
+    @staticmethod
+    def cursor_key(row):
+        return row['pub_date'], row['id']
+
+
+class BadRequest(Exception):
+    pass
+
+
+def _projection(request):
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(FIELDS)
+    fields = [field.strip() for field in requested.split(',')]
+    unknown = set(fields) - FIELDS.keys()
+    if unknown:
+        raise BadRequest(f'Unknown fields: {", ".join(sorted(unknown))}')
+    return fields
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', POSTS_PER_PAGE))
+    except ValueError:
+        raise BadRequest('limit must be an integer')
+    return min(max(limit, 1), MAX_LIMIT)
+
+
+def _serialize(row, fields):
+    return {field: row[FIELDS[field]] for field in fields}
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def _stream(request, page, fields):
+    """Yields the page as one JSON document, a post at a time."""
+
+    yield '{"results":['
+    for number, row in enumerate(page):
+        if number:
+            yield ','
+        yield encoder.encode(_serialize(row, fields))
+    yield '],"next":{},"previous":{}}}'.format(
+        json.dumps(_page_url(request, page.next_cursor)),
+        json.dumps(_page_url(request, page.previous_cursor)),
+    )
+
+
+def _feed_response(request, queryset):
+    try:
+        fields = _projection(request)
+        limit = _limit(request)
+    except BadRequest as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    # pub_date and id are the keyset, they are read even if not shown
+    lookups = {FIELDS[field] for field in fields} | {'id', 'pub_date'}
+    paginator = ValuesCursorPaginator(queryset.values(*lookups), limit)
+    page = paginator.get_page(request.GET.get('cursor'))
+    return StreamingHttpResponse(_stream(request, page, fields),
+                                 content_type='application/json')
+
+
+@query_budget(6)
+def index(request):
+    return _feed_response(request, Post.objects.feed())
+
+
+@query_budget(6)
+def group_posts(request, slug):
+    group = get_object_or_404(Group.objects.only('id'), slug=slug)
+    return _feed_response(request, group.posts.feed())
+
+
+@query_budget(6)
+def profile(request, username):
+    author = get_object_or_404(User.objects.only('id'), username=username)
+    return _feed_response(request, author.posts.feed())
+
+
+@query_budget(8)
+def post_detail(request, post_id):
+    try:
+        fields = _projection(request)
+    except BadRequest as error:
+        return JsonResponse({'error': str(error)}, status=400)
+    lookups = {FIELDS[field] for field in fields} | {'author_id'}
+    row = Post.objects.filter(pk=post_id).values(*lookups).first()
+    if row is None:
+        raise Http404('No Post matches the given query.')
+    data = _serialize(row, fields)
+    data['author_posts_count'] = counters.author_posts_count(
+        User(pk=row['author_id']))
+    data['url'] = request.build_absolute_uri(
+        reverse('posts:post_detail', kwargs={'post_id': post_id}))
+    return JsonResponse(data, encoder=DjangoJSONEncoder,
+                        json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,208 @@
+"""Helpers shared by the benchmark management commands.
+
+Benchmarks seed rows with a recognizable prefix and delete exactly the
+rows they seeded at the end. They refuse to run with DEBUG off unless
+forced; run them against a scratch database all the same.
+"""
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from . import counters
+from .models import Group, Post
+
+
+User = get_user_model()
+
+PREFIX = 'benchmark'
+
+
+def seed(posts, authors, groups, force=False):
+    """Bulk-creates authors, groups and posts spread evenly over them.
+
+    Returns the authors and groups created, to be passed to cleanup().
+    Refuses with DEBUG off, which is where production data lives,
+    unless force is set.
+    """
+
+    if not (settings.DEBUG or force):
+        raise CommandError('Benchmarks write to the database; run them '
+                           'with DEBUG on or pass --force.')
+    usernames = [f'{PREFIX}_{i}' for i in range(authors)]
+    slugs = [f'{PREFIX}-{i}' for i in range(groups)]
+    # SQLite does not return primary keys from bulk_create, so the rows
+    # are read back before posts refer to them; usernames and slugs are
+    # unique, the insert fails rather than picking up existing rows
+    with transaction.atomic():
+        User.objects.bulk_create(User(username=username)
+                                 for username in usernames)
+        Group.objects.bulk_create(
+            Group(title=f'{PREFIX} {i}', slug=slug, description=PREFIX)
+            for i, slug in enumerate(slugs))
+        authors = list(User.objects.filter(username__in=usernames))
+        groups = list(Group.objects.filter(slug__in=slugs))
+        Post.objects.bulk_create(
+            Post(text=f'{PREFIX} post {i}',
+                 author=authors[i % len(authors)],
+                 group=groups[i % len(groups)])
+            for i in range(posts))
+    # bulk_create bypasses the signals maintaining the counters
+    counters.recount()
+    return authors, groups
+
+
+def cleanup(authors, groups):
+    """Deletes what seed() created; the posts go with their authors."""
+
+    User.objects.filter(pk__in=[author.pk for author in authors]).delete()
+    Group.objects.filter(pk__in=[group.pk for group in groups]).delete()
+    counters.recount()
+
+
+def uncached_pages():
+    """Turns off the anonymous page cache, which would answer repeats."""
+
+    return override_settings(
+        CACHES={
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+            'benchmark_dummy': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+            },
+        },
+        PAGE_CACHE='benchmark_dummy',
+    )
+
+
+def time_requests(client, url, repeat, **extra):
+    """Returns wall-clock milliseconds of repeat GET requests."""
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, **extra)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summary(timings):
+    return (f'median {statistics.median(timings):.2f} ms, '
+            f'min {min(timings):.2f} ms, '
+            f'{len(timings) / sum(timings) * 1000:.0f} req/s '
+            f'over {len(timings)} requests')
+
+
+def percentile(timings, percent):
+    """Nearest-rank percentile of a non-empty list of timings."""
+
+    ordered = sorted(timings)
+    rank = max(1, round(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class Route:
+    """A URL replayed by run_load, as a guest or logged in as user."""
+
+    def __init__(self, name, url, weight=1, user=None):
+        self.name = name
+        self.url = url
+        self.weight = weight
+        self.user = user
+
+
+def _worker(routes, count, seed, results, lock):
+    clients = {}
+    choices = random.Random(seed).choices(
+        routes, weights=[route.weight for route in routes], k=count)
+    queries = 0
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        queries += 1
+        return execute(sql, params, many, context)
+
+    samples = []
+    try:
+        with connection.execute_wrapper(count_queries):
+            for route in choices:
+                client = clients.get(route.user)
+                if client is None:
+                    client = clients[route.user] = Client()
+                    if route.user is not None:
+                        client.force_login(route.user)
+                queries = 0
+                start = time.perf_counter()
+                response = client.get(route.url)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                elapsed = (time.perf_counter() - start) * 1000
+                samples.append((route.name, elapsed, queries,
+                                response.status_code))
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+    with lock:
+        results.extend(samples)
+
+
+def run_load(routes, requests, workers=1, seed=0):
+    """Replays a weighted random mix of routes from concurrent workers.
+
+    Every worker has its own clients and database connection. Returns
+    the wall-clock seconds and (route name, milliseconds, queries,
+    status) of every request.
+    """
+
+    results, lock = [], threading.Lock()
+    shares = [requests // workers + (i < requests % workers)
+              for i in range(workers)]
+    start = time.perf_counter()
+    if workers == 1:
+        _worker(routes, requests, seed, results, lock)
+    else:
+        threads = [threading.Thread(target=_worker,
+                                    args=(routes, share, seed + i,
+                                          results, lock))
+                   for i, share in enumerate(shares)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return time.perf_counter() - start, results
+
+
+def load_report(elapsed, results):
+    """Per-route latency percentiles, throughput and queries."""
+
+    by_route = defaultdict(list)
+    for name, milliseconds, queries, status in results:
+        by_route[name].append((milliseconds, queries, status))
+    report = {}
+    for name, samples in sorted(by_route.items()):
+        timings = [milliseconds for milliseconds, _, _ in samples]
+        report[name] = {
+            'requests': len(samples),
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'queries': round(statistics.mean(
+                queries for _, queries, _ in samples), 2),
+            'errors': sum(status >= 400 for _, _, status in samples),
+        }
+    report['total'] = {
+        'requests': len(results),
+        'requests_per_second': round(len(results) / elapsed, 1),
+    }
+    return report
@@ -0,0 +1,88 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from core import performance
+
+
+CARD_TEMPLATE = 'includes/post_item.html'
+
+
+def _cache():
+    return caches[settings.POST_CARDS_CACHE]
+
+
+def _version_key(kind, pk):
+    return f'post_card_version:{kind}:{pk}'
+
+
+def invalidate(kind, pk):
+    """Gives a post, group or author a fresh version, orphaning its cards.
+
+    Versions are random tokens rather than counters, so an evicted
+    version can never bring back a card rendered under an older one.
+    The version is bumped again after commit: a card rendered from the
+    old row while the write was in flight must not outlive it.
+    """
+
+    def bump():
+        _cache().set(_version_key(kind, pk), uuid.uuid4().hex, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def _versions(posts):
+    keys = set()
+    for post in posts:
+        keys.add(_version_key('post', post.pk))
+        keys.add(_version_key('author', post.author_id))
+        keys.add(_version_key('group', post.group_id))
+    versions = _cache().get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys - versions.keys()}
+    if missing:
+        _cache().set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def _card_key(post, versions, show_author):
+    return 'post_card:{}:{}:{}:{}.{}.{}'.format(
+        get_language(), int(show_author), post.pk,
+        versions[_version_key('post', post.pk)],
+        versions[_version_key('author', post.author_id)],
+        versions[_version_key('group', post.group_id)],
+    )
+
+
+def attach(posts, show_author=False):
+    """Sets post.card to the rendered card HTML for every post.
+
+    Cards of the whole page are read with one get_many, only the
+    missing ones are rendered and stored back with one set_many.
+    """
+
+    posts = list(posts)
+    if not posts:
+        return
+    versions = _versions(posts)
+    keys = {post.pk: _card_key(post, versions, show_author) for post in posts}
+    cached = _cache().get_many(keys.values())
+    performance.count('card_hits', len(cached))
+    rendered = {}
+    for post in posts:
+        card = cached.get(keys[post.pk])
+        if card is None:
+            card = render_to_string(CARD_TEMPLATE, {
+                'post': post,
+                'show_author': show_author,
+            })
+            rendered[keys[post.pk]] = card
+        post.card = mark_safe(card)
+    if rendered:
+        _cache().set_many(rendered, settings.POST_CARDS_TIMEOUT)
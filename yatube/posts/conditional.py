@@ -0,0 +1,93 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Max
+from django.views.decorators.http import condition
+
+from . import counters, page_cache
+from .models import Post, User
+
+
+def _etag(request, *parts):
+    """Mixes the viewer and global generation into the validators.
+
+    Pages greet the logged in user, show whom they follow, group titles
+    and author names, none of which touch the posts' own timestamps.
+    """
+
+    scopes = [page_cache.GLOBAL]
+    if request.user.is_authenticated:
+        scopes.append(page_cache.follow_scope(request.user.pk))
+    raw = '\n'.join(str(part) for part in (
+        *page_cache.generations(scopes),
+        request.user.pk,
+        request.GET.get('page', ''),
+        request.GET.get('cursor', ''),
+        *parts,
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def feed_condition(scope, scope_filter):
+    """ETag for a feed from the newest edit and post count.
+
+    No Last-Modified: the newest edit goes back in time when the newest
+    post is deleted, and a renamed group or a follow does not move it,
+    so If-Modified-Since would answer 304 to a changed page.
+    scope(**view_kwargs) is the page cache scope of the feed and
+    scope_filter(**view_kwargs) returns its Post filters. The aggregate
+    is cached until a write bumps the scope generation, so requests
+    served from the page cache stay free of queries.
+    """
+
+    def state(request, **kwargs):
+        if not hasattr(request, '_feed_state'):
+            feed_scope = scope(**kwargs)
+            generation, = page_cache.generations((feed_scope,))
+            key = f'feed_state:{feed_scope}:{generation}'
+            cache = caches[settings.PAGE_CACHE]
+            request._feed_state = cache.get(key)
+            if request._feed_state is None:
+                request._feed_state = (
+                    Post.objects.filter(**scope_filter(**kwargs))
+                    .order_by()
+                    .aggregate(last_modified=Max('modified'),
+                               count=Count('id')))
+                if not page_cache.replica_may_lag((feed_scope,)):
+                    cache.set(key, request._feed_state,
+                              settings.PAGE_CACHE_TIMEOUT)
+        return request._feed_state
+
+    def etag(request, *args, **kwargs):
+        feed = state(request, **kwargs)
+        return _etag(request, feed['last_modified'], feed['count'])
+
+    return condition(etag_func=etag)
+
+
+def post_state(request, post_id):
+    """modified and author_id of the post, read once per request."""
+
+    if not hasattr(request, '_post_state'):
+        request._post_state = (Post.objects.filter(pk=post_id)
+                               .values('modified', 'author_id').first())
+    return request._post_state
+
+
+def _post_etag(request, post_id):
+    post = post_state(request, post_id)
+    if post is None:
+        return None
+    # The page also shows how many posts the author has
+    author_count = counters.author_posts_count(User(pk=post['author_id']))
+    return _etag(request, post['modified'], author_count)
+
+
+def _post_last_modified(request, post_id):
+    post = post_state(request, post_id)
+    return post['modified'] if post is not None else None
+
+
+post_condition = condition(etag_func=_post_etag,
+                           last_modified_func=_post_last_modified)
@@ -0,0 +1,78 @@
+from django.db.models import Count, F
+
+from .models import Post, PostCounter
+
+
+TOTAL = 'all'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def post_scopes(author_id, group_id):
+    """Scopes a post with the given author and group is counted in."""
+
+    scopes = [TOTAL, author_scope(author_id)]
+    if group_id is not None:
+        scopes.append(group_scope(group_id))
+    return scopes
+
+
+def _get_count(scope, queryset):
+    """Reads the counter; a missing one is initialized with COUNT(*).
+
+    Only existing counters are incremented on writes, so a counter
+    created here already includes every committed post.
+    """
+
+    try:
+        return (PostCounter.objects.values_list('posts_count', flat=True)
+                .get(scope=scope))
+    except PostCounter.DoesNotExist:
+        count = queryset.count()
+        PostCounter.objects.get_or_create(scope=scope,
+                                          defaults={'posts_count': count})
+        return count
+
+
+def total_posts_count():
+    return _get_count(TOTAL, Post.objects.all())
+
+
+def author_posts_count(author):
+    return _get_count(author_scope(author.pk), author.posts.all())
+
+
+def group_posts_count(group):
+    return _get_count(group_scope(group.pk), group.posts.all())
+
+
+def add(scopes, delta):
+    PostCounter.objects.filter(scope__in=scopes).update(
+        posts_count=F('posts_count') + delta)
+
+
+def recount():
+    """Recomputes every counter, returns {scope: (old, new)} of the fixed."""
+
+    actual = {TOTAL: Post.objects.count()}
+    for field, scope in (('author', author_scope), ('group', group_scope)):
+        rows = (Post.objects.order_by().exclude(**{field: None})
+                .values_list(field).annotate(Count('id')))
+        actual.update((scope(pk), count) for pk, count in rows)
+    stored = dict(PostCounter.objects.values_list('scope', 'posts_count'))
+    fixed = {}
+    for scope, old in stored.items():
+        new = actual.get(scope, 0)
+        if old != new:
+            PostCounter.objects.filter(scope=scope).update(posts_count=new)
+            fixed[scope] = (old, new)
+    PostCounter.objects.bulk_create(
+        PostCounter(scope=scope, posts_count=count)
+        for scope, count in actual.items() if scope not in stored)
+    return fixed
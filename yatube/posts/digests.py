@@ -0,0 +1,75 @@
+"""Email digests of new posts for each user.
+
+A user's digest lists the posts published in a period in the
+groups they write in and by the authors they follow, their own
+posts left out. The posts of the period are read once and matched to
+the users in memory; the messages go through the outbox.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from .models import Follow, Post, User
+
+
+SUBJECT = 'Новые посты на Yatube'
+
+
+def _subscriptions():
+    """{user_id: (group ids, author ids)} of users having any."""
+
+    groups = defaultdict(set)
+    authors = defaultdict(set)
+    for author_id, group_id in (Post.objects.exclude(group=None)
+                                .order_by().values_list('author_id',
+                                                        'group_id')
+                                .distinct()):
+        groups[author_id].add(group_id)
+    for user_id, author_id in Follow.objects.values_list('user_id',
+                                                         'author_id'):
+        authors[user_id].add(author_id)
+    return {user_id: (groups[user_id], authors[user_id])
+            for user_id in groups.keys() | authors.keys()}
+
+
+def digests(since):
+    """Yields (user, posts) for users with new posts since since."""
+
+    posts = list(Post.objects.feed().filter(pub_date__gt=since))
+    if not posts:
+        return
+    subscriptions = _subscriptions()
+    users = (User.objects.filter(pk__in=subscriptions, is_active=True)
+             .exclude(email='').order_by('pk'))
+    for user in users.iterator():
+        groups, authors = subscriptions[user.pk]
+        selected = [post for post in posts
+                    if post.author_id != user.pk
+                    and (post.group_id in groups
+                         or post.author_id in authors)]
+        if selected:
+            yield user, selected
+
+
+def message(user, posts):
+    shown = posts[:settings.DIGEST_MAX_POSTS]
+    body = render_to_string('posts/digest_email.txt', {
+        'user': user,
+        'posts': [(post, settings.SITE_URL + reverse(
+            'posts:post_detail', kwargs={'post_id': post.pk}))
+            for post in shown],
+        'more': len(posts) - len(shown),
+    })
+    return EmailMessage(SUBJECT, body, to=[user.email])
+
+
+def send(since):
+    """Sends the digests, returns how many."""
+
+    messages = [message(user, posts) for user, posts in digests(since)]
+    if messages:
+        get_connection().send_messages(messages)
+    return len(messages)
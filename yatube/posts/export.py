@@ -0,0 +1,87 @@
+"""Streaming export of posts as NDJSON or CSV.
+
+Rows come from .values().iterator(), which fetches them from the
+database cursor in chunks, so memory use does not grow with the table.
+"""
+import csv
+import datetime as dt
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .api import FIELDS
+from .models import Post
+
+
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+CHUNK_SIZE = 2000
+
+
+def parse_day(value):
+    """Parses YYYY-MM-DD, raising ValueError on anything else."""
+
+    day = parse_date(value) if value else None
+    if value and day is None:
+        raise ValueError(f'Expected a YYYY-MM-DD date, got {value!r}')
+    return day
+
+
+def _start_of(day):
+    return timezone.make_aware(dt.datetime.combine(day, dt.time.min))
+
+
+def posts_for_export(group=None, author=None, since=None, until=None):
+    """Posts filtered by group slug, author username and an inclusive
+    range of days, oldest first."""
+
+    queryset = Post.objects.order_by('id')
+    if group:
+        queryset = queryset.filter(group__slug=group)
+    if author:
+        queryset = queryset.filter(author__username=author)
+    # Comparing with datetimes, unlike __date, can use the indexes
+    if since:
+        queryset = queryset.filter(pub_date__gte=_start_of(since))
+    if until:
+        queryset = queryset.filter(
+            pub_date__lt=_start_of(until + dt.timedelta(days=1)))
+    return queryset
+
+
+def _rows(queryset, chunk_size):
+    lookups = list(FIELDS.values())
+    for row in queryset.values(*lookups).iterator(chunk_size=chunk_size):
+        yield {field: row[lookup] for field, lookup in FIELDS.items()}
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(queryset, chunk_size=CHUNK_SIZE):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+    for row in _rows(queryset, chunk_size):
+        yield encoder.encode(row) + '\n'
+
+
+def csv_lines(queryset, chunk_size=CHUNK_SIZE):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for row in _rows(queryset, chunk_size):
+        if row['pub_date'] is not None:
+            row['pub_date'] = row['pub_date'].isoformat()
+        yield writer.writerow(row.values())
+
+
+def lines(export_format, queryset, chunk_size=CHUNK_SIZE):
+    if export_format == 'csv':
+        return csv_lines(queryset, chunk_size)
+    return ndjson_lines(queryset, chunk_size)
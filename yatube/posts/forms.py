@@ -6,12 +6,14 @@ class PostForm(ModelForm):
 
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
         labels = {
             'text': ('Текст поста'),
-            'group': ('Группа')
+            'group': ('Группа'),
+            'image': ('Картинка')
         }
         help_texts = {
             'text': ('Текст нового поста.'),
-            'group': ('Группа, к которой будет относиться пост')
+            'group': ('Группа, к которой будет относиться пост'),
+            'image': ('Картинка к посту, по желанию')
         }
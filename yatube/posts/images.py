@@ -0,0 +1,39 @@
+"""Thumbnails of post images for srcset, made by sorl-thumbnail.
+
+sorl makes a thumbnail on its first request, stores it under
+MEDIA_ROOT/cache/ and keeps its size and the size of the original in
+its key-value store (THUMBNAIL_KVSTORE, cached in THUMBNAIL_CACHE), so
+later renders read neither the files nor the images.
+"""
+from django.conf import settings
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.images import ImageFile
+
+
+def source(image):
+    """The original as a sorl ImageFile with its size."""
+
+    return default.kvstore.get_or_set(ImageFile(image))
+
+
+def thumbnails(image):
+    """Thumbnails of THUMBNAIL_WIDTHS narrower than the original."""
+
+    width = source(image).width
+    return [get_thumbnail(image, str(thumbnail_width))
+            for thumbnail_width in settings.THUMBNAIL_WIDTHS
+            if thumbnail_width < width]
+
+
+def srcset(image):
+    """src, srcset and dimensions for the img tag of an image field."""
+
+    original = source(image)
+    candidates = [(thumbnail.url, thumbnail.width)
+                  for thumbnail in thumbnails(image)]
+    candidates.append((image.url, original.width))
+    return {
+        'src': candidates[0][0],
+        'srcset': ', '.join(f'{url} {width}w' for url, width in candidates),
+        'size': tuple(original.size),
+    }
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from posts import benchmarking
+
+
+class Command(BaseCommand):
+    help = ('Compares the throughput of the JSON API with the HTML views '
+            'it mirrors on seeded data. Seeded rows are deleted at the '
+            'end, run it against a scratch database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--authors', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--force', action='store_true',
+                            help='Run with DEBUG off too.')
+
+    def handle(self, *args, **options):
+        authors, groups = benchmarking.seed(
+            options['posts'], options['authors'], options['groups'],
+            force=options['force'])
+        author, group = authors[0], groups[0]
+        post = author.posts.first()
+        views = {
+            'index': ('posts:index', 'posts:api_index', {}),
+            'group_list': ('posts:group_list', 'posts:api_group_list',
+                           {'slug': group.slug}),
+            'profile': ('posts:profile', 'posts:api_profile',
+                        {'username': author.username}),
+            'post_detail': ('posts:post_detail', 'posts:api_post_detail',
+                            {'post_id': post.pk}),
+        }
+        client = Client()
+        try:
+            with benchmarking.uncached_pages():
+                for name, (html, api, kwargs) in views.items():
+                    self.stdout.write(self.style.MIGRATE_LABEL(name))
+                    for kind, url_name in (('html', html), ('json', api)):
+                        url = reverse(url_name, kwargs=kwargs)
+                        timings = benchmarking.time_requests(
+                            client, url, options['repeat'])
+                        self.stdout.write(
+                            f'  {kind:4} {benchmarking.summary(timings)}')
+        finally:
+            benchmarking.cleanup(authors, groups)
@@ -0,0 +1,119 @@
+import threading
+import time
+import urllib.request
+
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import (ThreadedWSGIServer,
+                                          WSGIRequestHandler)
+from django.core.wsgi import get_wsgi_application
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from posts import benchmarking
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = ('Serves the site from a local threaded WSGI server and hits '
+            'the feeds and post pages from many clients at once, with '
+            'the independent queries of a view run in turn and in the '
+            'query thread pool. Seeded rows are deleted at the end, run '
+            'it against a scratch database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--authors', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--clients', type=int, default=32)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--workers', type=int, default=4,
+                            help='CONCURRENT_QUERY_WORKERS to compare '
+                                 'with running the queries in turn.')
+        parser.add_argument('--conn-max-age', type=int, default=600,
+                            help='CONN_MAX_AGE of the server, as in '
+                                 'production.')
+        parser.add_argument('--force', action='store_true',
+                            help='Run with DEBUG off too.')
+
+    def handle(self, *args, **options):
+        authors, groups = benchmarking.seed(
+            options['posts'], options['authors'], options['groups'],
+            force=options['force'])
+        database = connections.databases['default']
+        conn_max_age = database.get('CONN_MAX_AGE', 0)
+        database['CONN_MAX_AGE'] = options['conn_max_age']
+        server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+        server.set_app(get_wsgi_application())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_port}'
+        author, group = authors[0], groups[0]
+        post = author.posts.first()
+        urls = [base + url for url in (
+            reverse('posts:index') + '?page=3',
+            reverse('posts:group_list', kwargs={'slug': group.slug}),
+            reverse('posts:profile', kwargs={'username': author.username}),
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        )]
+        try:
+            # the slow query log would report the waits of the clients
+            with benchmarking.uncached_pages(), \
+                    override_settings(QUERY_INSPECTION=False):
+                for workers in (0, options['workers']):
+                    with override_settings(CONCURRENT_QUERY_WORKERS=workers):
+                        self.report(workers, self.run(urls, options))
+        finally:
+            server.shutdown()
+            server.server_close()
+            database['CONN_MAX_AGE'] = conn_max_age
+            connections.close_all()
+            benchmarking.cleanup(authors, groups)
+
+    @staticmethod
+    def run(urls, options):
+        timings, errors = [], []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+
+        def client(offset):
+            number = offset
+            while time.perf_counter() < deadline:
+                url = urls[number % len(urls)]
+                number += 1
+                start = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(url) as response:
+                        response.read()
+                except OSError as error:
+                    with lock:
+                        errors.append(error)
+                    continue
+                with lock:
+                    timings.append((time.perf_counter() - start) * 1000)
+
+        clients = [threading.Thread(target=client, args=(i,))
+                   for i in range(options['clients'])]
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+        return timings, errors, options['seconds']
+
+    def report(self, workers, result):
+        timings, errors, seconds = result
+        title = (f'{workers} query threads' if workers
+                 else 'queries in turn')
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        if not timings:
+            self.stdout.write(f'  no request succeeded, {len(errors)} '
+                              f'errors')
+            return
+        self.stdout.write(
+            f'  {len(timings) / seconds:.0f} req/s, '
+            f'p50 {benchmarking.percentile(timings, 50):.1f} ms, '
+            f'p95 {benchmarking.percentile(timings, 95):.1f} ms, '
+            f'{len(errors)} errors')
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from posts import benchmarking
+from posts.models import Post
+from yatube.settings import POSTS_PER_PAGE
+
+
+class Command(BaseCommand):
+    help = ('Seeds N posts, prints query plans and timings of the feed '
+            'views without and with the feed indexes. Seeded rows are '
+            'deleted at the end, run it against a scratch database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--authors', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--force', action='store_true',
+                            help='Run with DEBUG off too.')
+
+    def handle(self, *args, **options):
+        authors, groups = benchmarking.seed(
+            options['posts'], options['authors'], options['groups'],
+            force=options['force'])
+        self.stdout.write(f'Seeded {options["posts"]} posts, '
+                          f'{len(authors)} authors, {len(groups)} groups')
+        author, group = authors[0], groups[0]
+        feeds = {
+            'index': (Post.objects.feed(),
+                      reverse('posts:index')),
+            'group_list': (group.posts.feed(),
+                           reverse('posts:group_list',
+                                   kwargs={'slug': group.slug})),
+            'profile': (author.posts.feed(),
+                        reverse('posts:profile',
+                                kwargs={'username': author.username})),
+        }
+        try:
+            with benchmarking.uncached_pages():
+                with connection.schema_editor() as editor:
+                    for index in Post._meta.indexes:
+                        editor.remove_index(Post, index)
+                self.report('without indexes', feeds, options['repeat'])
+                with connection.schema_editor() as editor:
+                    for index in Post._meta.indexes:
+                        editor.add_index(Post, index)
+                self.report('with indexes', feeds, options['repeat'])
+        finally:
+            self.cleanup(authors, groups)
+
+    def cleanup(self, authors, groups):
+        with connection.cursor() as cursor:
+            existing = connection.introspection.get_constraints(
+                cursor, Post._meta.db_table)
+        with connection.schema_editor() as editor:
+            for index in Post._meta.indexes:
+                if index.name not in existing:
+                    editor.add_index(Post, index)
+        benchmarking.cleanup(authors, groups)
+
+    def report(self, title, feeds, repeat):
+        # SQLite keeps prepared statements per connection and would
+        # report the plans compiled against the previous schema
+        connection.close()
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        client = Client()
+        for name, (queryset, url) in feeds.items():
+            self.stdout.write(self.style.MIGRATE_LABEL(f'  {name} ({url})'))
+            for line in queryset[:POSTS_PER_PAGE].explain().splitlines():
+                self.stdout.write(f'    {line}')
+            timings = benchmarking.time_requests(client, url, repeat)
+            self.stdout.write(f'    {benchmarking.summary(timings)}')
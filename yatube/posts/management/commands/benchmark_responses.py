@@ -0,0 +1,113 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core import compression
+from posts import benchmarking
+
+
+# (encoding, level) compared, the configured ones among them
+LEVELS = (('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 4), ('br', 11))
+
+
+class Command(BaseCommand):
+    help = ('Measures the body size of typical pages with gzip and brotli '
+            'at several levels and the time to first byte and to the '
+            'last byte of the feeds rendered and streamed, on seeded '
+            'data. Times are taken in-process, without the network. '
+            'Seeded rows are deleted at the end, run it against a '
+            'scratch database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--authors', type=int, default=10)
+        parser.add_argument('--groups', type=int, default=5)
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--force', action='store_true',
+                            help='Run with DEBUG off too.')
+
+    def handle(self, *args, **options):
+        authors, groups = benchmarking.seed(
+            options['posts'], options['authors'], options['groups'],
+            force=options['force'])
+        try:
+            # the inspector's bookkeeping would be measured along
+            with benchmarking.uncached_pages(), \
+                    override_settings(QUERY_INSPECTION=False):
+                pages = self.pages(authors[0], groups[0])
+                self.compression(pages, options['repeat'])
+                self.streaming(pages, options['repeat'])
+        finally:
+            benchmarking.cleanup(authors, groups)
+
+    @staticmethod
+    def pages(author, group):
+        post = author.posts.first()
+        return {
+            'index': reverse('posts:index'),
+            'group_list': reverse('posts:group_list',
+                                  kwargs={'slug': group.slug}),
+            'profile': reverse('posts:profile',
+                               kwargs={'username': author.username}),
+            'post_detail': reverse('posts:post_detail',
+                                   kwargs={'post_id': post.pk}),
+            'api_index': reverse('posts:api_index'),
+        }
+
+    def compression(self, pages, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING('Compressed size'))
+        client = Client()
+        levels = [(encoding, level) for encoding, level in LEVELS
+                  if encoding in compression.available_encodings()]
+        for name, url in pages.items():
+            response = client.get(url)
+            content = (b''.join(response.streaming_content)
+                       if response.streaming else response.content)
+            self.stdout.write(f'  {name:12} {len(content):7} bytes')
+            for encoding, level in levels:
+                with override_settings(
+                        RESPONSE_COMPRESSION_LEVELS={encoding: level}):
+                    timings = []
+                    for _ in range(repeat):
+                        start = time.perf_counter()
+                        compressed = compression.compress(content, encoding)
+                        timings.append((time.perf_counter() - start) * 1000)
+                self.stdout.write(
+                    f'    {encoding:4} {level:2} {len(compressed):7} bytes '
+                    f'({len(compressed) / len(content):5.1%}), '
+                    f'{statistics.median(timings):6.3f} ms')
+
+    def streaming(self, pages, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            'Time to first / last byte, median'))
+        client = Client()
+        for name in ('index', 'group_list', 'profile'):
+            for streaming in (False, True):
+                with override_settings(STREAMING_FEEDS=streaming):
+                    first, last = self.time_bytes(client, pages[name],
+                                                  repeat)
+                mode = 'streamed' if streaming else 'rendered'
+                self.stdout.write(
+                    f'  {name:12} {mode:9} first '
+                    f'{statistics.median(first):7.2f} ms, last '
+                    f'{statistics.median(last):7.2f} ms')
+
+    @staticmethod
+    def time_bytes(client, url, repeat):
+        first, last = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = client.get(url)
+            if response.streaming:
+                chunks = iter(response.streaming_content)
+                next(chunks)
+                first.append((time.perf_counter() - start) * 1000)
+                b''.join(chunks)
+            else:
+                first.append((time.perf_counter() - start) * 1000)
+            last.append((time.perf_counter() - start) * 1000)
+        return first, last
@@ -0,0 +1,156 @@
+import json
+import platform
+import subprocess
+from contextlib import nullcontext
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from posts import benchmarking
+
+
+class Command(BaseCommand):
+    help = ('Replays a weighted mix of requests to the posts, users and '
+            'about pages from concurrent workers on seeded data and '
+            'reports latency percentiles, throughput and queries per '
+            'request. Seeded rows are deleted at the end, run it against '
+            'a scratch database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--authors', type=int, default=50)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed of the random request mix.')
+        parser.add_argument('--page-cache', action='store_true',
+                            help='Keep the anonymous page cache on.')
+        parser.add_argument('--output', help='Save the results as JSON.')
+        parser.add_argument('--compare', help='Results saved earlier to '
+                                              'print the change against.')
+        parser.add_argument('--force', action='store_true',
+                            help='Run with DEBUG off too.')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['requests'] < 1:
+            raise CommandError('--workers and --requests must be positive')
+        baseline = self.load(options['compare'])
+        authors, groups = benchmarking.seed(
+            options['posts'], options['authors'], options['groups'],
+            force=options['force'])
+        try:
+            pages = (nullcontext() if options['page_cache']
+                     else benchmarking.uncached_pages())
+            with pages:
+                elapsed, results = benchmarking.run_load(
+                    self.routes(authors[0], groups[0]), options['requests'],
+                    options['workers'], options['seed'])
+        finally:
+            benchmarking.cleanup(authors, groups)
+        report = benchmarking.load_report(elapsed, results)
+        self.print_report(report, baseline)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump({'environment': self.environment(options),
+                           'routes': report}, output, indent=2)
+                output.write('\n')
+
+    @staticmethod
+    def routes(author, group):
+        post = author.posts.first()
+        Route = benchmarking.Route
+        return [
+            Route('posts:index', reverse('posts:index'), 10),
+            Route('posts:index?page=2', reverse('posts:index') + '?page=2',
+                  3),
+            Route('posts:group_list',
+                  reverse('posts:group_list', kwargs={'slug': group.slug}),
+                  5),
+            Route('posts:profile',
+                  reverse('posts:profile',
+                          kwargs={'username': author.username}), 5),
+            Route('posts:post_detail',
+                  reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+                  8),
+            Route('posts:search', reverse('posts:search') + '?q=post', 2),
+            Route('posts:post_create', reverse('posts:post_create'), 1,
+                  author),
+            Route('posts:post_edit',
+                  reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+                  1, author),
+            Route('posts:api_index', reverse('posts:api_index'), 3),
+            Route('posts:api_group_list',
+                  reverse('posts:api_group_list',
+                          kwargs={'slug': group.slug}), 2),
+            Route('posts:api_profile',
+                  reverse('posts:api_profile',
+                          kwargs={'username': author.username}), 2),
+            Route('posts:api_post_detail',
+                  reverse('posts:api_post_detail',
+                          kwargs={'post_id': post.pk}), 2),
+            # logout is left out, it would end the session of the worker
+            Route('users:login', reverse('users:login'), 2),
+            Route('users:signup', reverse('users:signup'), 1),
+            Route('users:password_change',
+                  reverse('users:password_change'), 1, author),
+            Route('users:password_change_done',
+                  reverse('users:password_change_done'), 1, author),
+            Route('about:author', reverse('about:author'), 1),
+            Route('about:tech', reverse('about:tech'), 1),
+        ]
+
+    @staticmethod
+    def load(path):
+        if not path:
+            return None
+        try:
+            with open(path, encoding='utf-8') as saved:
+                return json.load(saved)['routes']
+        except (OSError, ValueError, KeyError) as error:
+            raise CommandError(f'Cannot read {path}: {error}')
+
+    @staticmethod
+    def environment(options):
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {
+            'commit': commit,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            **{name: options[name] for name in (
+                'posts', 'authors', 'groups', 'requests', 'workers', 'seed',
+                'page_cache')},
+        }
+
+    def print_report(self, report, baseline):
+        total = report.pop('total')
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{"route":32} {"n":>5} {"p50 ms":>8} {"p95 ms":>8} '
+            f'{"p99 ms":>8} {"queries":>7} {"errors":>6}'))
+        for name, row in report.items():
+            line = (f'{name:32} {row["requests"]:5} {row["p50_ms"]:8.2f} '
+                    f'{row["p95_ms"]:8.2f} {row["p99_ms"]:8.2f} '
+                    f'{row["queries"]:7.1f} {row["errors"]:6}')
+            previous = (baseline or {}).get(name)
+            if previous and previous['p50_ms']:
+                change = row['p50_ms'] / previous['p50_ms'] - 1
+                line += f'  p50 {change:+.0%}'
+                if row['queries'] != previous['queries']:
+                    line += f', queries {previous["queries"]:g} -> ' \
+                            f'{row["queries"]:g}'
+            self.stdout.write(line)
+        report['total'] = total
+        summary = (f'{total["requests"]} requests, '
+                   f'{total["requests_per_second"]} req/s')
+        previous = (baseline or {}).get('total')
+        if previous:
+            change = (total['requests_per_second']
+                      / previous['requests_per_second'] - 1)
+            summary += f' ({change:+.0%})'
+        self.stdout.write(self.style.SUCCESS(summary))
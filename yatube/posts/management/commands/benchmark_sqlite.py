@@ -0,0 +1,119 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import override_settings
+
+from posts import benchmarking
+from posts.models import Post
+from yatube.settings import POSTS_PER_PAGE
+
+
+# What SQLite and Python's sqlite3 do when nothing is set
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'delete',
+    'synchronous': 'full',
+    'busy_timeout': 5000,
+    'mmap_size': 0,
+    'cache_size': -2000,
+}
+
+
+class Command(BaseCommand):
+    help = ('Runs parallel feed readers and post writers against the '
+            'database with SQLite defaults and with SQLITE_PRAGMAS and '
+            'compares their throughput. Seeded rows are deleted at the '
+            'end, run it against a scratch database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=5000)
+        parser.add_argument('--authors', type=int, default=20)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--force', action='store_true',
+                            help='Run with DEBUG off too.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The default database is not SQLite')
+        if connection.settings_dict['NAME'] in ('', ':memory:'):
+            raise CommandError('Needs a database file, threads do not '
+                               'share an in-memory database')
+        authors, groups = benchmarking.seed(
+            options['posts'], options['authors'], options['groups'],
+            force=options['force'])
+        try:
+            runs = (('SQLite defaults', DEFAULT_PRAGMAS),
+                    ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS))
+            for title, pragmas in runs:
+                with override_settings(SQLITE_PRAGMAS=pragmas):
+                    # journal_mode only changes with no other connection,
+                    # it is switched here before the workers connect
+                    connections.close_all()
+                    connection.ensure_connection()
+                    self.report(title, self.run(authors, groups, options))
+        finally:
+            connections.close_all()
+            benchmarking.cleanup(authors, groups)
+
+    def run(self, authors, groups, options):
+        stats = {'reads': 0, 'writes': 0, 'locked': 0, 'write_ms': []}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + options['seconds']
+
+        def read():
+            list(Post.objects.feed()[:POSTS_PER_PAGE])
+            return 'reads'
+
+        def write(number):
+            start = time.perf_counter()
+            with transaction.atomic():
+                Post.objects.create(
+                    text=f'{benchmarking.PREFIX} concurrent {number}',
+                    author=authors[number % len(authors)],
+                    group=groups[number % len(groups)])
+            with lock:
+                stats['write_ms'].append((time.perf_counter() - start) * 1000)
+            return 'writes'
+
+        def worker(operation):
+            number = 0
+            try:
+                while time.perf_counter() < deadline:
+                    number += 1
+                    try:
+                        done = operation(number)
+                    except OperationalError:
+                        done = 'locked'
+                    with lock:
+                        stats[done] += 1
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker,
+                                    args=(lambda number: read(),))
+                   for _ in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=(write,))
+                    for _ in range(options['writers'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats['seconds'] = options['seconds']
+        return stats
+
+    def report(self, title, stats):
+        seconds = stats['seconds']
+        line = (f'  reads {stats["reads"] / seconds:8.0f}/s, '
+                f'writes {stats["writes"] / seconds:6.0f}/s, '
+                f'"database is locked" {stats["locked"]}')
+        if stats['write_ms']:
+            line += (f', write p95 '
+                     f'{benchmarking.percentile(stats["write_ms"], 95):.1f} '
+                     f'ms')
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        self.stdout.write(line)
@@ -0,0 +1,110 @@
+import copy
+import shutil
+import statistics
+import tempfile
+import time
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import templatebuild
+from posts import benchmarking
+from posts.models import Group, Post, User
+
+
+TEMPLATE = 'posts/index.html'
+
+
+class Command(BaseCommand):
+    help = ('Renders the main page with 10, 100 and 1000 posts using the '
+            'plain loaders, the cached loader and the cached loader over '
+            'the compiled templates. Needs no database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+',
+                            default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--card-cache', action='store_true',
+                            help='Keep the post card cache on, only '
+                                 'the page around the cards is rendered.')
+
+    def handle(self, *args, **options):
+        output_dir = tempfile.mkdtemp()
+        try:
+            templatebuild.build(settings.COMPILED_TEMPLATES, output_dir)
+            configurations = {
+                'plain loaders': self.templates(),
+                'cached loader': self.templates(cached=True),
+                'cached + compiled': self.templates(cached=True,
+                                                    compiled=output_dir),
+            }
+            cards = (nullcontext() if options['card_cache'] else
+                     override_settings(POST_CARDS_CACHE='benchmark_dummy'))
+            with benchmarking.uncached_pages(), cards:
+                for size in options['sizes']:
+                    self.stdout.write(self.style.MIGRATE_HEADING(
+                        f'{size} posts'))
+                    request = self.request()
+                    context = {'page_obj': self.page(size)}
+                    for title, templates in configurations.items():
+                        with override_settings(TEMPLATES=templates):
+                            timings = self.time_render(
+                                context, request, options['repeat'])
+                        median = statistics.median(timings)
+                        self.stdout.write(
+                            f'  {title:18} median {median:8.2f} ms, '
+                            f'{median / size * 1000:6.1f} µs per post')
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    @staticmethod
+    def templates(cached=False, compiled=None):
+        templates = copy.deepcopy(settings.TEMPLATES)
+        options = templates[0]['OPTIONS']
+        templates[0]['DIRS'] = [
+            directory for directory in templates[0]['DIRS']
+            if directory != settings.COMPILED_TEMPLATES_DIR]
+        if compiled:
+            templates[0]['DIRS'].insert(0, compiled)
+        loaders = settings.TEMPLATE_LOADERS
+        options['loaders'] = ([('django.template.loaders.cached.Loader',
+                                loaders)] if cached else loaders)
+        return templates
+
+    @staticmethod
+    def request():
+        request = RequestFactory().get(reverse('posts:index'))
+        request.user = AnonymousUser()
+        return request
+
+    @staticmethod
+    def page(size):
+        """A page of unsaved posts, rendering it runs no queries."""
+
+        authors = [User(pk=i, username=f'author_{i}') for i in range(1, 6)]
+        groups = [Group(pk=i, title=f'Группа {i}', slug=f'group-{i}')
+                  for i in range(1, 4)]
+        now = timezone.now()
+        posts = [Post(pk=i, text=f'Пост {i}\nвторая строка', pub_date=now,
+                      author=authors[i % len(authors)],
+                      group=groups[i % len(groups)] if i % 4 else None)
+                 for i in range(1, size + 1)]
+        return Paginator(posts, size).get_page(1)
+
+    @staticmethod
+    def time_render(context, request, repeat):
+        render_to_string(TEMPLATE, context, request)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            render_to_string(TEMPLATE, context, request)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
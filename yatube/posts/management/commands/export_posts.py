@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = ('Streams posts with author username and group slug as NDJSON '
+            'or CSV, in constant memory.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=export.FORMATS,
+                            default='ndjson')
+        parser.add_argument('--group', help='Group slug.')
+        parser.add_argument('--author', help='Author username.')
+        parser.add_argument('--since', help='First day, YYYY-MM-DD.')
+        parser.add_argument('--until', help='Last day, YYYY-MM-DD.')
+        parser.add_argument('--chunk-size', type=int,
+                            default=export.CHUNK_SIZE)
+        parser.add_argument('--output', help='File to write, stdout if '
+                                             'omitted.')
+
+    def handle(self, *args, **options):
+        try:
+            since = export.parse_day(options['since'])
+            until = export.parse_day(options['until'])
+        except ValueError as error:
+            raise CommandError(error)
+        queryset = export.posts_for_export(
+            options['group'], options['author'], since, until)
+        lines = export.lines(options['format'], queryset,
+                             options['chunk_size'])
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8',
+                      newline='') as output:
+                output.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
@@ -0,0 +1,178 @@
+import csv
+import json
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Case, DateTimeField, F, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import counters, page_cache, tasks
+from posts.forms import PostForm
+from posts.models import Follow, Group, Post, User
+
+
+# rows whose dates one UPDATE restores, in SQLite's 999 parameters
+DATES_CHUNK = 200
+
+
+def _ndjson_rows(lines):
+    """Parsed lines; a malformed one is passed on as is to be rejected."""
+
+    for line in lines:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                yield line
+
+
+class Command(BaseCommand):
+    help = ('Imports posts from NDJSON or CSV as written by export_posts, '
+            'validating them like PostForm and inserting in batches.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to read, - for stdin.')
+        parser.add_argument('--format', choices=('ndjson', 'csv'),
+                            help='Guessed from the extension if omitted.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--rejects',
+                            help='Write rejected rows here as NDJSON.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson')
+        if path == '-':
+            self.import_rows(sys.stdin, import_format, options)
+            return
+        try:
+            with open(path, encoding='utf-8', newline='') as source:
+                self.import_rows(source, import_format, options)
+        except OSError as error:
+            raise CommandError(error)
+
+    def import_rows(self, source, import_format, options):
+        rows = (csv.DictReader(source) if import_format == 'csv'
+                else _ndjson_rows(source))
+        # Lookup maps are built once instead of a query per row
+        self.authors = dict(User.objects.values_list('username', 'id'))
+        self.groups = dict(Group.objects.values_list('slug', 'id'))
+        self.text_field = PostForm.base_fields['text']
+        self.now = timezone.now()
+        self.touched = set()
+        self.batch_size = options['batch_size']
+        rejects = (open(options['rejects'], 'w', encoding='utf-8')
+                   if options['rejects'] else None)
+        imported = rejected = 0
+        batch = []
+        start = time.perf_counter()
+        try:
+            for number, row in enumerate(rows, 1):
+                try:
+                    batch.append(self.build(row))
+                except ValidationError as error:
+                    rejected += 1
+                    self.reject(rejects, number, row, error)
+                    continue
+                if len(batch) >= options['batch_size']:
+                    imported += self.flush(batch)
+                    batch = []
+            imported += self.flush(batch)
+        finally:
+            if rejects is not None:
+                rejects.close()
+            self.refresh_derived_data()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {imported} posts, rejected {rejected} in '
+            f'{elapsed:.1f} s ({imported / elapsed if elapsed else 0:.0f} '
+            f'posts/s).'))
+
+    def build(self, row):
+        """Validates a row with PostForm's rules and returns a Post."""
+
+        if not isinstance(row, dict):
+            raise ValidationError('Not a JSON object')
+        text = self.text_field.clean(row.get('text'))
+        author = row.get('author')
+        if author not in self.authors:
+            raise ValidationError(f'Unknown author {author!r}')
+        group = row.get('group') or None
+        if group is not None and group not in self.groups:
+            raise ValidationError(f'Unknown group {group!r}')
+        pub_date = self.now
+        if row.get('pub_date'):
+            try:
+                pub_date = parse_datetime(str(row['pub_date']))
+            except ValueError:
+                pub_date = None
+            if pub_date is None:
+                raise ValidationError(f'Bad pub_date {row["pub_date"]!r}')
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+        self.touched.add((author, group))
+        return Post(text=text, pub_date=pub_date, modified=pub_date,
+                    author_id=self.authors[author],
+                    group_id=self.groups.get(group))
+
+    def flush(self, batch):
+        """Inserts the batch and restores its imported dates.
+
+        bulk_create sets pub_date and modified to now like save() does;
+        update() leaves them as given. Backends that do not return the
+        pks of inserted rows, SQLite among them, insert them after the
+        last existing one and in order.
+        """
+
+        if not batch:
+            return 0
+        with transaction.atomic():
+            last_pk = (Post.objects.order_by('-pk')
+                       .values_list('pk', flat=True).first() or 0)
+            dates = [post.pub_date for post in batch]
+            Post.objects.bulk_create(batch, batch_size=self.batch_size)
+            pks = [post.pk for post in batch]
+            if None in pks:
+                pks = list(Post.objects.filter(pk__gt=last_pk)
+                           .order_by('pk').values_list('pk', flat=True))
+            rows = list(zip(pks, dates))
+            for start in range(0, len(rows), DATES_CHUNK):
+                chunk = rows[start:start + DATES_CHUNK]
+                posts = Post.objects.filter(pk__in=[pk for pk, _ in chunk])
+                posts.update(pub_date=Case(
+                    *(When(pk=pk, then=Value(date)) for pk, date in chunk),
+                    output_field=DateTimeField()))
+                posts.update(modified=F('pub_date'))
+        return len(batch)
+
+    def reject(self, rejects, number, row, error):
+        message = '; '.join(error.messages)
+        if rejects is not None:
+            rejects.write(json.dumps({'line': number, 'error': message,
+                                      'row': row}, ensure_ascii=False) + '\n')
+        else:
+            self.stderr.write(f'Line {number}: {message}')
+
+    def refresh_derived_data(self):
+        """bulk_create skips the signals behind counters, caches and
+        follower timelines."""
+
+        if not self.touched:
+            return
+        counters.recount()
+        scopes = {page_cache.index_scope()}
+        for author, group in self.touched:
+            scopes.add(page_cache.profile_scope(author))
+            if group is not None:
+                scopes.add(page_cache.group_scope(group))
+        page_cache.bump(scopes)
+        author_ids = {self.authors[author] for author, _ in self.touched}
+        followed = (Follow.objects.filter(author_id__in=author_ids)
+                    .order_by().values_list('author_id', flat=True)
+                    .distinct())
+        for author_id in followed:
+            tasks.backfill_followers.delay(author_id=author_id)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts import page_cache
+
+
+class Command(BaseCommand):
+    help = 'Shows hit/miss counters of the anonymous page cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help='Zero the counters after printing them.')
+
+    def handle(self, *args, **options):
+        stats = page_cache.stats(reset=options['reset'])
+        requests = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / requests if requests else 0
+        self.stdout.write(f'hits: {stats["hits"]}\n'
+                          f'misses: {stats["misses"]}\n'
+                          f'hit ratio: {ratio:.1%}')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the full-text search index of posts from scratch.'
+
+    def handle(self, *args, **options):
+        if not search.is_available():
+            raise CommandError('Full-text search needs the SQLite backend.')
+        search.install_triggers(sender=None)
+        search.rebuild()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts import timelines
+from posts.models import TimelineEntry
+
+
+class Command(BaseCommand):
+    help = ('Refills the follow feed timelines from the follows and posts, '
+            'or with --trim only deletes entries past TIMELINE_LENGTH.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--trim', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['trim']:
+            deleted = timelines.trim()
+            self.stdout.write(self.style.SUCCESS(
+                f'Timelines trimmed, {deleted} entries deleted.'))
+            return
+        timelines.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Timelines rebuilt, {TimelineEntry.objects.count()} entries.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the denormalized post counters and repairs drift.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            fixed = counters.recount()
+        for scope, (old, new) in sorted(fixed.items()):
+            self.stdout.write(f'{scope}: {old} -> {new}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Counters recomputed, {len(fixed)} drifted.'))
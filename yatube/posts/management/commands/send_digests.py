@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts import digests
+
+
+class Command(BaseCommand):
+    help = ('Emails every user the posts published in the last --hours '
+            'in their groups and by the authors they follow; run it '
+            'once per period, e.g. daily from cron.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24)
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options['hours'])
+        count = digests.send(since)
+        self.stdout.write(self.style.SUCCESS(
+            f'{count} digests queued.'))
@@ -0,0 +1,22 @@
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image',
+            field=models.FileField(
+                blank=True, help_text='Загрузите картинку',
+                upload_to='posts/',
+                validators=[django.core.validators.FileExtensionValidator(
+                    ('jpg', 'jpeg', 'png', 'gif', 'webp'))],
+                verbose_name='Картинка'),
+        ),
+    ]
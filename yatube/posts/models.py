@@ -16,6 +16,23 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    """Shared querysets for the post feeds."""
+
+    FEED_FIELDS = (
+        'id', 'text', 'pub_date',
+        'author__id', 'author__username',
+        'author__first_name', 'author__last_name',
+        'group__id', 'group__slug', 'group__title', 'image',
+    )
+
+    def feed(self):
+        """Joins author and group up front and loads only shown columns."""
+
+        return (self.select_related('author', 'group')
+                .only(*self.FEED_FIELDS))
+
+
 class Post(models.Model):
     """defines Post table with descrement order by dates."""
 
@@ -26,6 +43,10 @@ class Post(models.Model):
     pub_date = models.DateTimeField(
         auto_now_add=True
     )
+    modified = models.DateTimeField(
+        auto_now=True,
+        db_index=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -42,8 +63,99 @@ class Post(models.Model):
         help_text='Выберите группу'
     )
 
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        blank=True,
+        help_text='Загрузите картинку'
+    )
+
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(fields=('group', '-pub_date'),
+                         name='post_group_pub_date_idx'),
+            models.Index(fields=('author', '-pub_date'),
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=('-pub_date', '-id'),
+                         name='post_pub_date_id_idx'),
+        )
 
     def __str__(self) -> str:
         return self.text[:15]
+
+
+class PostCounter(models.Model):
+    """Denormalized number of posts in a feed scope.
+
+    Scopes are 'all', 'author:<id>' and 'group:<id>'.
+    """
+
+    scope = models.CharField(max_length=50, unique=True)
+    posts_count = models.IntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.scope}: {self.posts_count}'
+
+
+class Follow(models.Model):
+    """user follows author.
+
+    fan_out_on_read marks follows of authors with more than
+    TIMELINE_FANOUT_LIMIT followers: their posts are not copied into
+    the followers' timelines, the follow feed reads them by author.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+    fan_out_on_read = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('user', 'author'),
+                                    name='follow_user_author_unique'),
+            models.CheckConstraint(check=~models.Q(user=models.F('author')),
+                                   name='follow_not_self'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.user_id} -> {self.author_id}'
+
+
+class TimelineEntry(models.Model):
+    """A post pushed into the follow feed of owner when it was written."""
+
+    owner = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    # copied from the post to page the timeline from its own index
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(fields=('owner', 'post'),
+                                    name='timeline_owner_post_unique'),
+        )
+        indexes = (
+            models.Index(fields=('owner', '-pub_date', '-post'),
+                         name='timeline_owner_pub_date_idx'),
+        )
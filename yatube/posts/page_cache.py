@@ -0,0 +1,179 @@
+import hashlib
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+from core import performance
+from core.routers import using_replica
+
+
+# Group titles and author names show up on every kind of feed page
+GLOBAL = 'all'
+
+STATS_KEYS = {
+    'hits': 'page_cache_stats:hits',
+    'misses': 'page_cache_stats:misses',
+}
+
+
+def _cache():
+    return caches[settings.PAGE_CACHE]
+
+
+def index_scope():
+    return 'index'
+
+
+def group_scope(slug):
+    return f'group_list:{slug}'
+
+
+def profile_scope(username):
+    return f'profile:{username}'
+
+
+def follow_scope(user_id):
+    return f'follow:{user_id}'
+
+
+def _generation_key(scope):
+    return f'page_generation:{scope}'
+
+
+def _bumped_key(scope):
+    return f'page_bumped:{scope}'
+
+
+def bump(scopes):
+    """Starts a new generation for the scopes, orphaning their pages.
+
+    Bumped again after commit, like the post card versions. The scopes
+    are also marked as recently bumped for REPLICA_STICKY_SECONDS.
+    """
+
+    def set_generations():
+        _cache().set_many({_generation_key(scope): uuid.uuid4().hex
+                           for scope in scopes}, None)
+        _cache().set_many({_bumped_key(scope): True for scope in scopes},
+                          settings.REPLICA_STICKY_SECONDS)
+
+    if scopes:
+        set_generations()
+        transaction.on_commit(set_generations)
+
+
+def replica_may_lag(scopes):
+    """Whether this request reads a replica that may not have the last
+    write to the scopes yet.
+
+    The write started a new generation, so caching what such a read
+    sees would keep the stale data under it until the next write.
+    """
+
+    return (using_replica()
+            and bool(_cache().get_many([_bumped_key(scope)
+                                        for scope in scopes])))
+
+
+def generations(scopes):
+    """Current generation tokens of the scopes, started when missing."""
+
+    keys = [_generation_key(scope) for scope in scopes]
+    tokens = _cache().get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in tokens}
+    if missing:
+        _cache().set_many(missing, None)
+        tokens.update(missing)
+    return [tokens[key] for key in keys]
+
+
+def _page_key(request, scope):
+    raw = '\n'.join((
+        *generations((GLOBAL, scope)),
+        request.path,
+        request.GET.get('page', ''),
+        request.GET.get('cursor', ''),
+    ))
+    return f'page:{scope}:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _count(stat):
+    performance.count(f'page_cache_{stat}')
+    key = STATS_KEYS[stat]
+    _cache().add(key, 0, None)
+    try:
+        _cache().incr(key)
+    except ValueError:
+        # evicted between add() and incr()
+        _cache().set(key, 1, None)
+
+
+def stats(reset=False):
+    values = _cache().get_many(STATS_KEYS.values())
+    result = {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+    if reset:
+        _cache().delete_many(STATS_KEYS.values())
+    return result
+
+
+def _cache_when_sent(key, response):
+    """Wraps the streamed page to cache it once all of it is sent.
+
+    The headers are taken now, like those of a rendered page cached
+    right away: by the time the body is read, the middleware may have
+    set a Content-Encoding that the uncompressed chunks do not have.
+    """
+
+    headers = list(response.items())
+    status = response.status_code
+    content = response.streaming_content
+
+    def pass_through():
+        chunks = []
+        for chunk in content:
+            chunks.append(chunk)
+            yield chunk
+        page = HttpResponse(b''.join(chunks), status=status)
+        for header, value in headers:
+            page[header] = value
+        _cache().set(key, page, settings.PAGE_CACHE_TIMEOUT)
+
+    return pass_through()
+
+
+def cache_anonymous_page(scope):
+    """Caches the view for anonymous GET requests.
+
+    scope(**view_kwargs) names the generation the page belongs to;
+    writes bump the generation instead of hunting for cached pages.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method != 'GET'
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            page_scope = scope(**kwargs)
+            key = _page_key(request, page_scope)
+            response = _cache().get(key)
+            if response is not None:
+                _count('hits')
+                return response
+            _count('misses')
+            response = view(request, *args, **kwargs)
+            if (response.status_code != 200 or response.cookies
+                    or replica_may_lag((GLOBAL, page_scope))):
+                return response
+            if response.streaming:
+                response.streaming_content = _cache_when_sent(key,
+                                                              response)
+            else:
+                _cache().set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
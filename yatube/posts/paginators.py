@@ -0,0 +1,177 @@
+import base64
+import json
+
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from core.concurrency import gather
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CountedPaginator(Paginator):
+    """Paginator taking the total from a counter instead of COUNT(*)."""
+
+    def __init__(self, object_list, per_page, counter, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.counter = counter
+
+    @cached_property
+    def count(self):
+        # a drifted counter must not produce negative slices
+        return max(self.counter(), 0)
+
+    def get_page(self, number):
+        """Reads the page and the total at the same time.
+
+        The page is fetched for the requested number before the total
+        is known; numbers Paginator.get_page would replace are handed
+        back to it.
+        """
+
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            number = 1
+        if number < 1:
+            return super().get_page(number)
+        bottom = (number - 1) * self.per_page
+        rows, count = gather(
+            lambda: list(self.object_list[
+                bottom:bottom + self.per_page + self.orphans]),
+            self.counter,
+        )
+        self.count = max(count, 0)
+        if number > self.num_pages:
+            return super().get_page(number)
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        return self._get_page(rows[:top - bottom], number, self)
+
+
+class CursorPage:
+    """Page of the keyset paginator, mimics the parts of Page we render."""
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset pagination on (pub_date, id) without COUNT and OFFSET.
+
+    Pages are addressed with opaque cursors pointing at the edge post of
+    the neighbouring page, so deep pages cost the same as the first one.
+    """
+
+    is_cursor = True
+    ordering = ('-pub_date', '-id')
+
+    def __init__(self, object_list, per_page, counter=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.counter = counter
+
+    @cached_property
+    def count(self):
+        if self.counter is not None:
+            return self.counter()
+        return self.object_list.count()
+
+    @staticmethod
+    def encode_value(payload):
+        raw = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    @staticmethod
+    def decode_value(cursor):
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        return json.loads(raw.decode())
+
+    @staticmethod
+    def cursor_key(post):
+        return post.pub_date, post.pk
+
+    @classmethod
+    def encode_cursor(cls, post, backwards=False):
+        pub_date, pk = cls.cursor_key(post)
+        return cls.encode_value([pub_date.isoformat(), pk, int(backwards)])
+
+    @classmethod
+    def decode_cursor(cls, cursor):
+        try:
+            pub_date, pk, backwards = cls.decode_value(cursor)
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise InvalidCursor(cursor)
+        if pub_date is None:
+            raise InvalidCursor(cursor)
+        return pub_date, pk, bool(backwards)
+
+    def page(self, cursor=None):
+        """Returns the page after (or before) the post the cursor encodes."""
+
+        queryset = self.object_list.order_by(*self.ordering)
+        backwards = False
+        if cursor:
+            pub_date, pk, backwards = self.decode_cursor(cursor)
+            if backwards:
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+                ).order_by('pub_date', 'id')
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+                )
+        posts = list(queryset[:self.per_page + 1])
+        has_more = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        if backwards:
+            posts.reverse()
+        if not posts:
+            return CursorPage(posts, self)
+        has_next = has_more if not backwards else True
+        has_previous = bool(cursor) if not backwards else has_more
+        return CursorPage(
+            posts,
+            self,
+            next_cursor=(self.encode_cursor(posts[-1])
+                         if has_next else None),
+            previous_cursor=(self.encode_cursor(posts[0], backwards=True)
+                             if has_previous else None),
+        )
+
+    def get_page(self, cursor=None):
+        """Like page(), but falls back to the first page on a bad cursor."""
+
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page()
@@ -0,0 +1,158 @@
+import re
+
+from django.db import connection, connections
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+from .paginators import CursorPage, CursorPaginator, InvalidCursor
+
+
+FTS_TABLE = 'posts_post_fts'
+
+# The table is created by a migration; Django rebuilds posts_post on
+# SQLite for most schema changes, which drops triggers, so they are
+# (re)installed after every migrate instead.
+TRIGGERS = (
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text);
+    END''',
+)
+
+# Control characters cannot come from the form, so they safely mark
+# the match in the snippet until the text is escaped
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def is_available(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def install_triggers(sender, using='default', **kwargs):
+    """post_migrate handler keeping the index in sync with posts_post."""
+
+    if not is_available(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT 1 FROM sqlite_master WHERE name = %s',
+                       [FTS_TABLE])
+        if cursor.fetchone() is None:
+            return
+        for trigger in TRIGGERS:
+            cursor.execute(trigger)
+
+
+def rebuild():
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) "
+                       f"VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) "
+                       f"VALUES ('optimize')")
+
+
+def fts_query(text):
+    """Turns user input into an FTS5 query matching all of its words.
+
+    Every word is quoted, so operators and stray quotes in the input
+    cannot produce a syntax error.
+    """
+
+    return ' '.join(f'"{word}"' for word in re.findall(r'\w+', text))
+
+
+def filter_posts(queryset, text):
+    """Restricts a Post queryset to posts matching text."""
+
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [fts_query(text)]))
+
+
+def _highlight(snippet):
+    return mark_safe(escape(snippet)
+                     .replace(MARK_START, '<mark>')
+                     .replace(MARK_END, '</mark>'))
+
+
+class SearchPaginator(CursorPaginator):
+    """Keyset pagination over (bm25 rank, id) of the matching posts."""
+
+    snippet_tokens = 16
+
+    def __init__(self, text, per_page):
+        super().__init__(None, per_page)
+        self.query = fts_query(text)
+
+    def _matches(self, after, backwards):
+        sql = (f'SELECT rowid, bm25({FTS_TABLE}), '
+               f"snippet({FTS_TABLE}, 0, %s, %s, '…', %s) "
+               f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s')
+        params = [MARK_START, MARK_END, self.snippet_tokens, self.query]
+        if after is not None:
+            operator = '<' if backwards else '>'
+            sql += f' AND (bm25({FTS_TABLE}), rowid) {operator} (%s, %s)'
+            params.extend(after)
+        direction = 'DESC' if backwards else 'ASC'
+        sql += (f' ORDER BY bm25({FTS_TABLE}) {direction}, '
+                f'rowid {direction} LIMIT %s')
+        params.append(self.per_page + 1)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    @classmethod
+    def encode_cursor(cls, match, backwards=False):
+        pk, rank, snippet = match
+        return cls.encode_value([rank, pk, int(backwards)])
+
+    @classmethod
+    def decode_cursor(cls, cursor):
+        try:
+            rank, pk, backwards = cls.decode_value(cursor)
+            return (float(rank), int(pk)), bool(backwards)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise InvalidCursor(cursor)
+
+    def page(self, cursor=None):
+        if not self.query:
+            return CursorPage([], self)
+        after, backwards = None, False
+        if cursor:
+            after, backwards = self.decode_cursor(cursor)
+        matches = self._matches(after, backwards)
+        has_more = len(matches) > self.per_page
+        matches = matches[:self.per_page]
+        if backwards:
+            matches.reverse()
+        posts = Post.objects.feed().in_bulk([pk for pk, *_ in matches])
+        results = []
+        for pk, rank, snippet in matches:
+            # skip posts deleted between the two queries
+            if pk in posts:
+                posts[pk].snippet = _highlight(snippet)
+                results.append(posts[pk])
+        if not matches:
+            return CursorPage(results, self)
+        has_next = has_more if not backwards else True
+        has_previous = bool(cursor) if not backwards else has_more
+        return CursorPage(
+            results,
+            self,
+            next_cursor=(self.encode_cursor(matches[-1])
+                         if has_next else None),
+            previous_cursor=(self.encode_cursor(matches[0], backwards=True)
+                             if has_previous else None),
+        )
@@ -0,0 +1,119 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import cards, counters, page_cache, tasks
+from core import routers
+from .models import Follow, Group, Post, User
+
+AUTHOR_CARD_FIELDS = frozenset(('username', 'first_name', 'last_name'))
+
+
+@receiver(pre_save, sender=Post)
+def remember_saved(sender, instance, **kwargs):
+    """Keeps the stored author and group to notice an edit moving the post."""
+
+    instance._saved = None
+    if instance.pk is not None:
+        instance._saved = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('author_id', 'group_id',
+                         'author__username', 'group__slug')
+            .first())
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, **kwargs):
+    saved_scopes = set()
+    if instance._saved is not None:
+        saved_scopes = set(counters.post_scopes(*instance._saved[:2]))
+    scopes = set(counters.post_scopes(instance.author_id, instance.group_id))
+    counters.add(saved_scopes - scopes, -1)
+    counters.add(scopes - saved_scopes, 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    counters.add(counters.post_scopes(instance.author_id,
+                                      instance.group_id), -1)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created:
+        tasks.fan_out_post.delay(post_id=instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def queue_thumbnails(sender, instance, **kwargs):
+    """Makes the thumbnails before the first feed asks for them."""
+
+    if instance.image:
+        tasks.generate_thumbnails.delay(image_name=instance.image.name)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_pages(sender, instance, **kwargs):
+    """Profiles show the viewer whether they follow the author."""
+
+    page_cache.bump([page_cache.follow_scope(instance.user_id)])
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_card(sender, instance, **kwargs):
+    cards.invalidate('post', instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_cards(sender, instance, **kwargs):
+    cards.invalidate('group', instance.pk)
+    page_cache.bump([page_cache.GLOBAL])
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_cards(sender, instance, update_fields=None, **kwargs):
+    """Login only touches last_login, which cards do not show."""
+
+    if update_fields is None or AUTHOR_CARD_FIELDS & set(update_fields):
+        cards.invalidate('author', instance.pk)
+        page_cache.bump([page_cache.GLOBAL])
+
+
+def _post_pages(username, slug):
+    scopes = [page_cache.index_scope(), page_cache.profile_scope(username)]
+    if slug is not None:
+        scopes.append(page_cache.group_scope(slug))
+    return scopes
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    scopes = set(_post_pages(
+        instance.author.username,
+        instance.group.slug if instance.group_id is not None else None))
+    if getattr(instance, '_saved', None) is not None:
+        scopes.update(_post_pages(*instance._saved[2:]))
+    page_cache.bump(scopes)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def stick_author_to_primary(sender, instance, **kwargs):
+    """The author sees their change before the replica has it."""
+
+    routers.stick_to_primary(instance.author_id)
+
+
+@receiver(post_save, sender=User)
+def stick_new_user_to_primary(sender, instance, created, **kwargs):
+    if created:
+        routers.stick_to_primary(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def stick_follower_to_primary(sender, instance, **kwargs):
+    routers.stick_to_primary(instance.user_id)
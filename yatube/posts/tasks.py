@@ -0,0 +1,28 @@
+"""Side effects of post writes run by the core.jobs worker."""
+from core.jobs import task
+
+from . import images, timelines
+from .models import Post
+
+
+@task
+def fan_out_post(post_id):
+    post = (Post.objects.filter(pk=post_id)
+            .only('id', 'author_id', 'pub_date').first())
+    if post is not None:
+        timelines.fan_out(post)
+
+
+@task
+def backfill_followers(author_id):
+    timelines.backfill_followers(author_id)
+
+
+@task
+def trim_timelines():
+    timelines.trim()
+
+
+@task
+def generate_thumbnails(image_name):
+    images.thumbnails(image_name)
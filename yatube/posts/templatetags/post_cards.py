@@ -0,0 +1,18 @@
+from django import template
+from django.urls import reverse
+
+from posts import cards
+
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def load_post_cards(context, page_obj):
+    """Fills post.card for the page; the author is shown on the main page."""
+
+    request = context.get('request')
+    show_author = (request is not None
+                   and request.path == reverse('posts:index'))
+    cards.attach(page_obj, show_author)
+    return ''
@@ -0,0 +1,23 @@
+from django import template
+from django.conf import settings
+from django.utils.html import format_html
+
+from posts import images
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_image(post, alt=''):
+    """Lazily loaded img of the post image with its thumbnails in srcset."""
+
+    if not post.image:
+        return ''
+    image = images.srcset(post.image)
+    width, height = image['size']
+    return format_html(
+        '<img class="card-img my-2" src="{}" srcset="{}" sizes="{}" '
+        'width="{}" height="{}" alt="{}" loading="lazy" decoding="async">',
+        image['src'], image['srcset'], settings.THUMBNAIL_SIZES,
+        width, height, alt)
@@ -0,0 +1,83 @@
+import json
+from http import HTTPStatus
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post, Group, User
+from yatube.settings import POSTS_PER_PAGE
+
+
+class YatubeApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='shuki')
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+        cls.NUM_OF_POSTS = POSTS_PER_PAGE + 3
+        for i in range(cls.NUM_OF_POSTS):
+            Post.objects.create(author=cls.user, text=f'Тестовый текст {i}',
+                                group=cls.group)
+        cls.post = Post.objects.filter(group=cls.group).last()
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def get_json(self, url, **params):
+        response = self.guest_client.get(url, params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        content = (b''.join(response.streaming_content)
+                   if response.streaming else response.content)
+        return json.loads(content.decode())
+
+    def test_feeds_paginate_by_cursor(self):
+        """Ленты API отдают все посты по курсору без повторов."""
+        urls = (
+            reverse('posts:api_index'),
+            reverse('posts:api_group_list',
+                    kwargs={'slug': self.group.slug}),
+            reverse('posts:api_profile',
+                    kwargs={'username': self.user.username}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                data = self.get_json(url)
+                self.assertEqual(len(data['results']), POSTS_PER_PAGE)
+                self.assertEqual(data['results'][0]['author'], 'shuki')
+                self.assertEqual(data['results'][0]['group'],
+                                 self.group.slug)
+                self.assertIsNone(data['previous'])
+                second = self.get_json(data['next'])
+                self.assertEqual(len(second['results']), 3)
+                self.assertIsNone(second['next'])
+                ids = [post['id'] for post in data['results']
+                       + second['results']]
+                self.assertEqual(sorted(ids, reverse=True), ids)
+                self.assertEqual(len(set(ids)), self.NUM_OF_POSTS)
+
+    def test_fields_projection(self):
+        data = self.get_json(reverse('posts:api_index'),
+                             fields='id,author', limit=2)
+        self.assertEqual(data['results'][0].keys(), {'id', 'author'})
+        self.assertEqual(len(data['results']), 2)
+        self.assertIn('fields=id%2Cauthor', data['next'])
+        response = self.guest_client.get(reverse('posts:api_index'),
+                                         {'fields': 'id,password'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_post_detail(self):
+        data = self.get_json(reverse('posts:api_post_detail',
+                                     kwargs={'post_id': self.post.pk}))
+        self.assertEqual(data['text'], self.post.text)
+        self.assertEqual(data['author_posts_count'], self.NUM_OF_POSTS)
+        response = self.guest_client.get(
+            reverse('posts:api_post_detail', kwargs={'post_id': 0}))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_feed_reads_no_model_instances(self):
+        with self.assertNumQueries(1):
+            self.get_json(reverse('posts:api_index'))
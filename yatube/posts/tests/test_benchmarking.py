@@ -0,0 +1,64 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from posts import benchmarking
+from posts.models import Group, Post, User
+
+
+class YatubeBenchmarkTests(TestCase):
+    def test_percentile(self):
+        timings = list(range(1, 101))
+        self.assertEqual(benchmarking.percentile(timings, 50), 50)
+        self.assertEqual(benchmarking.percentile(timings, 99), 99)
+        self.assertEqual(benchmarking.percentile([7], 95), 7)
+
+    def test_benchmark_routes(self):
+        """Команда проходит все маршруты и сохраняет отчёт в JSON."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'results.json')
+            call_command('benchmark_routes', '--posts=30', '--authors=3',
+                         '--groups=2', '--requests=60', '--workers=1',
+                         '--force', f'--output={path}',
+                         stdout=io.StringIO())
+            with open(path, encoding='utf-8') as saved:
+                results = json.load(saved)
+        routes = results['routes']
+        self.assertEqual(routes['total']['requests'], 60)
+        for name in ('posts:index', 'users:login', 'about:tech'):
+            with self.subTest(name=name):
+                self.assertIn(name, routes)
+        for name, row in routes.items():
+            if name != 'total':
+                self.assertEqual(row['errors'], 0, name)
+        self.assertGreater(routes['posts:index']['queries'], 0)
+        # засеянные строки удалены
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(User.objects.exists())
+
+    def test_cleanup_keeps_other_rows(self):
+        """Удаляются только засеянные строки, даже с тем же префиксом."""
+        user = User.objects.create_user(username='benchmark_owner')
+        group = Group.objects.create(title='benchmark', slug='benchmark-own')
+        Post.objects.create(author=user, group=group, text='Свой пост')
+        authors, groups = benchmarking.seed(4, 2, 2, force=True)
+        self.assertEqual(len(authors), 2)
+        self.assertNotIn(user, authors)
+        benchmarking.cleanup(authors, groups)
+        self.assertQuerysetEqual(User.objects.all(), [user],
+                                 transform=lambda row: row)
+        self.assertQuerysetEqual(Group.objects.all(), [group],
+                                 transform=lambda row: row)
+        self.assertEqual(Post.objects.get().text, 'Свой пост')
+
+    def test_refuses_without_debug(self):
+        """Без DEBUG и --force бенчмарк не трогает базу."""
+        with self.assertRaisesMessage(CommandError, '--force'):
+            call_command('benchmark_feeds', '--posts=1',
+                         stdout=io.StringIO())
+        self.assertFalse(User.objects.exists())
@@ -0,0 +1,61 @@
+import threading
+
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from core.concurrency import gather
+from posts import counters
+from posts.models import Post, User
+from posts.paginators import CountedPaginator
+
+
+def _thread_name():
+    return threading.current_thread().name
+
+
+@override_settings(CONCURRENT_QUERY_WORKERS=2)
+class YatubeConcurrentQueriesTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='shuki')
+        for i in range(13):
+            Post.objects.create(author=self.user, text=f'Тестовый текст {i}')
+
+    def test_gather_uses_pool(self):
+        """Все функции, кроме первой, выполняются в пуле потоков."""
+        first, second = gather(_thread_name, _thread_name)
+        self.assertEqual(first, threading.current_thread().name)
+        self.assertTrue(second.startswith('queries'))
+
+    def test_counted_paginator(self):
+        paginator = CountedPaginator(
+            Post.objects.order_by('id'), 10,
+            lambda: counters.author_posts_count(self.user))
+        page = paginator.get_page(2)
+        self.assertEqual(paginator.count, 13)
+        self.assertEqual([post.text for post in page],
+                         [f'Тестовый текст {i}' for i in range(10, 13)])
+        self.assertTrue(page.has_previous())
+        # номер за пределами даёт последнюю страницу, как у Paginator
+        self.assertEqual(paginator.get_page(7).number, 2)
+        self.assertEqual(paginator.get_page('abc').number, 1)
+
+    def test_post_detail(self):
+        post = Post.objects.first()
+        response = Client().get(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}))
+        self.assertEqual(response.context['post_by_text_id'], post)
+        self.assertEqual(response.context['post_count'], 13)
+        response = Client().get(
+            reverse('posts:post_detail', kwargs={'post_id': 10 ** 6}))
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(CONCURRENT_QUERY_WORKERS=2)
+class YatubeConcurrentQueriesInTransactionTests(TestCase):
+    def test_gather_in_transaction(self):
+        """В транзакции запросы идут по очереди в текущем потоке."""
+        self.assertEqual(gather(_thread_name, _thread_name),
+                         [threading.current_thread().name] * 2)
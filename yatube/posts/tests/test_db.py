@@ -0,0 +1,33 @@
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core import db
+
+
+class YatubeSQLiteTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """Новое соединение получает настройки из SQLITE_PRAGMAS."""
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('cache_size'), -64 * 1024)
+
+    def test_bad_pragma(self):
+        with override_settings(SQLITE_PRAGMAS={'cache_size; DROP': 1}):
+            with self.assertRaises(ValueError):
+                db.configure_sqlite(None, connection)
+
+
+class YatubeImmediateTransactionTests(TransactionTestCase):
+    def test_begin_immediate(self):
+        """Транзакция сразу берёт блокировку на запись."""
+        with CaptureQueriesContext(connection) as queries:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+        self.assertEqual(queries[0]['sql'], 'BEGIN IMMEDIATE')
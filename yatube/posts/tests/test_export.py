@@ -0,0 +1,84 @@
+import csv
+import datetime as dt
+import io
+import json
+from http import HTTPStatus
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Post, Group, User
+
+
+class YatubeExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='shuki')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+        cls.post = Post.objects.create(author=cls.user,
+                                       text='Тестовый текст, "в кавычках"',
+                                       group=cls.group)
+        cls.old_post = Post.objects.create(author=cls.staff,
+                                           text='Старый пост')
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - dt.timedelta(days=10))
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def export(self, **params):
+        response = self.staff_client.get(reverse('posts:export'), params)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_staff_only(self):
+        response = self.guest_client.get(reverse('posts:export'))
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    def test_ndjson_with_filters(self):
+        """Экспорт отдаёт отфильтрованные посты построчно в NDJSON."""
+        rows = [json.loads(line) for line in self.export().splitlines()]
+        self.assertEqual([row['id'] for row in rows],
+                         [self.post.pk, self.old_post.pk])
+        self.assertEqual(rows[0]['author'], 'shuki')
+        self.assertEqual(rows[0]['group'], self.group.slug)
+        self.assertIsNone(rows[1]['group'])
+        today = timezone.localdate().isoformat()
+        for params in ({'group': self.group.slug}, {'author': 'shuki'},
+                       {'since': today}):
+            with self.subTest(params=params):
+                rows = self.export(**params).splitlines()
+                self.assertEqual([json.loads(row)['id'] for row in rows],
+                                 [self.post.pk])
+        self.assertEqual(self.export(until=today, author='staff').count('\n'),
+                         1)
+
+    def test_csv(self):
+        rows = list(csv.DictReader(io.StringIO(self.export(format='csv'))))
+        self.assertEqual(rows[0]['text'], self.post.text)
+        self.assertEqual(rows[1]['group'], '')
+
+    def test_bad_params(self):
+        for params in ({'format': 'xml'}, {'since': 'вчера'}):
+            with self.subTest(params=params):
+                response = self.staff_client.get(reverse('posts:export'),
+                                                 params)
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.BAD_REQUEST)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('export_posts', '--format=ndjson', '--chunk-size=1',
+                     '--author=shuki', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['text'], self.post.text)
@@ -0,0 +1,127 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+from posts import timelines
+from posts.models import Follow, Post, TimelineEntry, User
+
+
+class YatubeFollowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='writer')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.old_post = Post.objects.create(author=cls.author,
+                                           text='Старый пост автора')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def follow_feed(self):
+        response = self.client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_follow_and_unfollow(self):
+        """Подписка и отписка через страницы профиля."""
+        profile = reverse('posts:profile',
+                          kwargs={'username': self.author.username})
+        response = self.client.get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': self.author.username}))
+        self.assertRedirects(response, profile)
+        self.assertTrue(Follow.objects.filter(user=self.user,
+                                              author=self.author).exists())
+        self.assertTrue(self.client.get(profile).context['following'])
+        self.client.get(reverse('posts:profile_unfollow',
+                                kwargs={'username': self.author.username}))
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(self.client.get(profile).context['following'])
+
+    def test_cannot_follow_self(self):
+        self.client.get(reverse('posts:profile_follow',
+                                kwargs={'username': self.user.username}))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_guest_redirected(self):
+        response = Client().get(reverse('posts:follow_index'))
+        self.assertRedirects(response, reverse('users:login'))
+
+    def test_fan_out_on_write(self):
+        """Новый пост попадает в ленту подписчика, но не чужую."""
+        timelines.follow(self.user, self.author)
+        self.assertEqual(self.follow_feed(), [self.old_post])
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        # рассылка по лентам идёт в фоновой задаче
+        self.assertEqual(self.follow_feed(), [self.old_post])
+        jobs.run_pending()
+        self.assertTrue(TimelineEntry.objects.filter(
+            owner=self.user, post=post).exists())
+        self.assertEqual(self.follow_feed(), [post, self.old_post])
+        Post.objects.create(author=self.stranger, text='Чужой пост')
+        jobs.run_pending()
+        self.assertEqual(self.follow_feed(), [post, self.old_post])
+        timelines.unfollow(self.user, self.author)
+        self.assertEqual(self.follow_feed(), [])
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=1)
+    def test_fan_out_on_read(self):
+        """Посты автора с множеством подписчиков читаются по автору."""
+        timelines.follow(self.user, self.author)
+        timelines.follow(self.stranger, self.author)
+        self.assertEqual(
+            Follow.objects.filter(fan_out_on_read=True).count(), 2)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        jobs.run_pending()
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.follow_feed(), [post, self.old_post])
+        # автор снова под лимитом: недавние посты копируются в ленты
+        timelines.unfollow(self.stranger, self.author)
+        jobs.run_pending()
+        self.assertFalse(Follow.objects.get().fan_out_on_read)
+        self.assertTrue(TimelineEntry.objects.filter(
+            owner=self.user, post=post).exists())
+        self.assertEqual(self.follow_feed(), [post, self.old_post])
+
+    @override_settings(TIMELINE_LENGTH=2)
+    def test_trim_and_rebuild(self):
+        timelines.follow(self.user, self.author)
+        posts = [Post.objects.create(author=self.author, text=f'Пост {i}')
+                 for i in range(3)]
+        jobs.run_pending()
+        self.assertEqual(self.follow_feed(), posts[:0:-1])
+        self.assertEqual(timelines.trim(), 2)
+        self.assertEqual(TimelineEntry.objects.count(), 2)
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self.follow_feed(), posts[:0:-1])
+
+    @override_settings(TIMELINE_LENGTH=2, TIMELINE_TRIM_DELAY=0)
+    def test_trimmed_after_fan_out(self):
+        """Рассылка ставит одну задачу обрезки лент на все посты."""
+        timelines.follow(self.user, self.author)
+        timelines.follow(self.stranger, self.author)
+        posts = [Post.objects.create(author=self.author, text=f'Пост {i}')
+                 for i in range(3)]
+        jobs.run_pending()
+        self.assertEqual(TimelineEntry.objects.count(), 4)
+        self.assertEqual(self.follow_feed(), posts[:0:-1])
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(TIMELINE_TRIM_DELAY=60)
+    def test_trim_queued_once(self):
+        timelines.follow(self.user, self.author)
+        for i in range(3):
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+        jobs.run_pending()
+        trim = Job.objects.get()
+        self.assertEqual(trim.task, 'posts.tasks.trim_timelines')
+        self.assertGreater(trim.run_at, timezone.now())
@@ -0,0 +1,119 @@
+import io
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from core import jobs
+from posts import images
+from posts.forms import PostForm
+from posts.models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def wide_png(width=1000, height=500):
+    output = io.BytesIO()
+    Image.new('RGB', (width, height), 'red').save(output, 'PNG')
+    return output.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, JOBS_EAGER=False,
+                   THUMBNAIL_WIDTHS=(320, 640, 960))
+class YatubePostImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='painter')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create_post(self, content, name='picture.gif'):
+        self.client.post(reverse('posts:post_create'), {
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(name, content),
+        })
+        return Post.objects.get(text='Пост с картинкой')
+
+    def test_upload(self):
+        """Картинка загружается и показывается в ленте с lazy-загрузкой."""
+        post = self.create_post(SMALL_GIF)
+        self.assertTrue(post.image.name.startswith('posts/picture'))
+        jobs.run_pending()
+        html = Client().get(reverse('posts:index')).content.decode()
+        self.assertIn(f'src="{post.image.url}"', html)
+        self.assertIn('width="2" height="1"', html)
+        self.assertIn('loading="lazy"', html)
+
+    def test_not_an_image(self):
+        """Проверяется содержимое файла, а не только расширение."""
+        files = {
+            'script.js': b'alert(1)',
+            'fake.png': b'alert(1)',
+        }
+        for name, content in files.items():
+            with self.subTest(name=name):
+                form = PostForm({'text': 'Текст'}, files={
+                    'image': SimpleUploadedFile(name, content)})
+                self.assertIn('image', form.errors)
+
+    def test_srcset(self):
+        """srcset предлагает миниатюры уже оригинала и сам оригинал."""
+        post = self.create_post(wide_png(), 'wide.png')
+        image = images.srcset(post.image)
+        self.assertEqual(image['size'], (1000, 500))
+        self.assertEqual(image['srcset'].count('w, '), 3)
+        self.assertIn(' 640w, ', image['srcset'])
+        self.assertTrue(image['srcset'].endswith(f'{post.image.url} 1000w'))
+        html = Client().get(reverse('posts:index')).content.decode()
+        self.assertIn('width="1000" height="500"', html)
+
+    def test_thumbnail_made_once(self):
+        """Миниатюра создаётся по первому запросу и затем не пересоздаётся."""
+        post = self.create_post(wide_png(), 'wide.png')
+        thumbnail = images.thumbnails(post.image)[1]
+        self.assertEqual(thumbnail.size, [640, 320])
+        path = default_storage.path(thumbnail.name)
+        modified = os.path.getmtime(path)
+        # размеры берутся из хранилища sorl, картинки не открываются
+        with mock.patch.object(Image, 'open') as image_open:
+            self.assertEqual(images.thumbnails(post.image)[1].name,
+                             thumbnail.name)
+            images.srcset(post.image)
+        image_open.assert_not_called()
+        self.assertEqual(os.path.getmtime(path), modified)
+
+    def test_thumbnails_made_in_background(self):
+        """После фоновой задачи лента не открывает картинки."""
+        post = self.create_post(wide_png(), 'wide.png')
+        jobs.run_pending()
+        with mock.patch.object(Image, 'open') as image_open:
+            html = Client().get(reverse('posts:index')).content.decode()
+        image_open.assert_not_called()
+        for thumbnail in images.thumbnails(post.image):
+            self.assertIn(f'{thumbnail.url} {thumbnail.width}w', html)
@@ -0,0 +1,115 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from core import jobs
+from posts import counters, timelines
+from posts.management.commands import import_posts
+from posts.models import Post, Group, User
+
+
+class YatubeImportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='shuki')
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w', encoding='utf-8') as source:
+            source.write(content)
+        return path
+
+    def import_posts(self, *args):
+        out = io.StringIO()
+        call_command('import_posts', *args, stdout=out, stderr=out)
+        return out.getvalue()
+
+    def test_ndjson_batches_and_rejects(self):
+        """Импорт пишет валидные строки пачками и отклоняет остальные."""
+        rows = [
+            {'text': f'Пост {i}', 'author': 'shuki',
+             'group': self.group.slug,
+             'pub_date': f'2020-01-0{i + 1}T03:04:05Z'}
+            for i in range(5)
+        ]
+        rows += [
+            {'text': '', 'author': 'shuki'},
+            {'text': 'Пост', 'author': 'nobody'},
+            {'text': 'Пост', 'author': 'shuki', 'group': 'nowhere'},
+            {'text': 'Пост', 'author': 'shuki', 'pub_date': 'вчера'},
+        ]
+        content = '\n'.join(json.dumps(row) for row in rows) + '\n{broken\n'
+        rejects = os.path.join(self.tmp_dir, 'rejects.ndjson')
+        out = self.import_posts(self.write('posts.ndjson', content),
+                                '--batch-size=2', f'--rejects={rejects}')
+        self.assertIn('Imported 5 posts, rejected 5', out)
+        with open(rejects, encoding='utf-8') as source:
+            self.assertEqual([json.loads(line)['line'] for line in source],
+                             [6, 7, 8, 9, 10])
+        post = Post.objects.get(text='Пост 0')
+        self.assertEqual(post.pub_date.year, 2020)
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(counters.group_posts_count(self.group), 5)
+        self.assertEqual(post.modified, post.pub_date)
+        # у каждой строки своя дата, в том числе через пачки
+        for i in range(5):
+            self.assertEqual(
+                Post.objects.get(text=f'Пост {i}').pub_date.isoformat(),
+                f'2020-01-0{i + 1}T03:04:05+00:00')
+
+    def test_follower_timelines(self):
+        """Импортированные посты попадают в ленты подписчиков."""
+        follower = User.objects.create_user(username='follower')
+        timelines.follow(follower, self.user)
+        row = {'text': 'Импортированный пост', 'author': 'shuki'}
+        self.import_posts(self.write('posts.ndjson', json.dumps(row)))
+        jobs.run_pending()
+        self.assertIn('Импортированный пост',
+                      [post.text for post in timelines.feed(follower)])
+
+    def test_saves_during_import(self):
+        """Посты, сохранённые во время импорта, получают свои даты."""
+        saved = []
+        flush = import_posts.Command.flush
+
+        def flush_and_save(command, batch):
+            saved.append(Post.objects.create(author=self.user,
+                                             text='Во время импорта'))
+            return flush(command, batch)
+
+        row = {'text': 'Пост', 'author': 'shuki',
+               'pub_date': '2020-01-02T03:04:05Z'}
+        with mock.patch.object(import_posts.Command, 'flush',
+                               flush_and_save):
+            self.import_posts(self.write('posts.ndjson', json.dumps(row)))
+        self.assertGreater(saved[0].pub_date.year, 2020)
+        self.assertEqual(Post.objects.get(text='Пост').pub_date.year, 2020)
+
+    def test_export_roundtrip_csv(self):
+        Post.objects.create(author=self.user, text='Текст, "с запятой"',
+                            group=self.group)
+        Post.objects.create(author=self.user, text='Без группы')
+        path = os.path.join(self.tmp_dir, 'posts.csv')
+        call_command('export_posts', '--format=csv', f'--output={path}')
+        self.assertIn('Imported 2 posts, rejected 0',
+                      self.import_posts(path))
+        self.assertEqual(
+            Post.objects.filter(text='Текст, "с запятой"',
+                                group=self.group).count(), 2)
+        self.assertEqual(counters.author_posts_count(self.user), 4)
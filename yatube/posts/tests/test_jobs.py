@@ -0,0 +1,93 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+
+
+calls = []
+
+
+@jobs.task
+def remember(value):
+    calls.append(value)
+
+
+@jobs.task(max_attempts=2)
+def fail(value):
+    calls.append(value)
+    raise RuntimeError(value)
+
+
+@override_settings(JOBS_EAGER=False)
+class YatubeJobsTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_and_run(self):
+        """Задача ставится в очередь и выполняется воркером."""
+        remember.delay(value='привет')
+        job = Job.objects.get()
+        self.assertEqual(job.task, f'{__name__}.remember')
+        self.assertEqual(calls, [])
+        call_command('run_jobs', once=True, stdout=StringIO())
+        self.assertEqual(calls, ['привет'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_retry_with_backoff(self):
+        """Упавшая задача повторяется позже, затем помечается ошибкой."""
+        fail.delay(value=1)
+        with self.assertLogs('core.jobs', 'WARNING'):
+            self.assertEqual(jobs.run_pending(), (0, 1))
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('RuntimeError', job.error)
+        # повтор ещё не наступил
+        self.assertEqual(jobs.run_pending(), (0, 0))
+        Job.objects.update(run_at=timezone.now())
+        with self.assertLogs('core.jobs', 'ERROR'):
+            self.assertEqual(jobs.run_pending(), (0, 1))
+        self.assertEqual(Job.objects.get().status, Job.FAILED)
+        self.assertEqual(calls, [1, 1])
+        self.assertEqual(jobs.requeue_failed(), 1)
+        self.assertEqual(Job.objects.get().status, Job.QUEUED)
+
+    def test_stale_running_job_taken_over(self):
+        """Задачу упавшего воркера забирает другой по истечении блокировки."""
+        remember.delay(value='снова')
+        job = jobs.claim_next()
+        self.assertIsNone(jobs.claim_next())
+        Job.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(jobs.run_pending(), (1, 0))
+        self.assertEqual(calls, ['снова'])
+
+    def test_rolled_back_with_transaction(self):
+        """Задача откатывается вместе с транзакцией записи."""
+        try:
+            with transaction.atomic():
+                remember.delay(value='откат')
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(JOBS_EAGER=True)
+class YatubeEagerJobsTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_after_commit(self):
+        """Без воркера задача выполняется сразу после коммита."""
+        with transaction.atomic():
+            remember.delay(value='после коммита')
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ['после коммита'])
+        self.assertFalse(Job.objects.exists())
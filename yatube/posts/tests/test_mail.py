@@ -0,0 +1,128 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job, OutboxMessage
+from posts import digests, timelines
+from posts.models import Group, Post, User
+
+
+class CountingBackend(EmailBackend):
+    """locmem, считающий открытые соединения и отказывающий bad@."""
+
+    opened = 0
+
+    def open(self):
+        type(self).opened += 1
+        return True
+
+    def send_messages(self, messages):
+        if any('bad@example.com' in message.to for message in messages):
+            raise ConnectionRefusedError('bad@example.com')
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxBackend',
+    EMAIL_DELIVERY_BACKEND=f'{__name__}.CountingBackend',
+    JOBS_EAGER=False)
+class YatubeOutboxTests(TestCase):
+    def setUp(self):
+        CountingBackend.opened = 0
+
+    def test_password_reset_queued(self):
+        """Письмо для сброса пароля ждёт в очереди, а не уходит сразу."""
+        User.objects.create_user(username='forgetful',
+                                 email='forgetful@example.com',
+                                 password='Sup3r-secret-pass')
+        Client().post(reverse('password_reset'),
+                      {'email': 'forgetful@example.com'})
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxMessage.objects.get().to,
+                         'forgetful@example.com')
+        jobs.run_pending()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('forgetful', mail.outbox[0].body)
+        self.assertFalse(OutboxMessage.objects.exists())
+
+    def test_batch_over_one_connection(self):
+        """Очередь отправляется пачками через одно соединение."""
+        for i in range(5):
+            mail.send_mail(f'Тема {i}', 'Текст', None,
+                           [f'user{i}@example.com'])
+        with self.settings(EMAIL_OUTBOX_BATCH_SIZE=2):
+            jobs.run_pending()
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(CountingBackend.opened, 1)
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_message_retried(self):
+        """Отклонённое письмо повторяется позже, остальные доходят."""
+        mail.send_mail('Тема', 'Текст', None, ['bad@example.com'])
+        mail.send_mail('Тема', 'Текст', None, ['good@example.com'])
+        with self.assertLogs('core.mail', 'WARNING'):
+            jobs.run_pending()
+        self.assertEqual([message.to for message in mail.outbox],
+                         [['good@example.com']])
+        failed = OutboxMessage.objects.get()
+        self.assertEqual((failed.status, failed.attempts),
+                         (OutboxMessage.QUEUED, 1))
+        self.assertGreater(failed.run_at, timezone.now())
+        # повторная отправка запланирована на время повтора
+        retry = Job.objects.get()
+        self.assertEqual(retry.run_at, failed.run_at)
+        with self.settings(EMAIL_OUTBOX_MAX_ATTEMPTS=2):
+            OutboxMessage.objects.update(run_at=timezone.now())
+            Job.objects.update(run_at=timezone.now())
+            with self.assertLogs('core.mail', 'ERROR'):
+                jobs.run_pending()
+        self.assertEqual(OutboxMessage.objects.get().status,
+                         OutboxMessage.FAILED)
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.OutboxBackend',
+    EMAIL_DELIVERY_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    JOBS_EAGER=False)
+class YatubeDigestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.member = User.objects.create_user(
+            username='member', email='member@example.com')
+        cls.writer = User.objects.create_user(
+            username='writer', email='writer@example.com')
+        cls.reader = User.objects.create_user(
+            username='reader', email='reader@example.com')
+        cls.silent = User.objects.create_user(username='silent')
+        timelines.follow(cls.silent, cls.writer)
+        Post.objects.create(author=cls.member, group=cls.group,
+                            text='Давний пост участника')
+        Post.objects.update(pub_date=timezone.now() - timedelta(days=2))
+        timelines.follow(cls.reader, cls.writer)
+        cls.post = Post.objects.create(author=cls.writer, group=cls.group,
+                                       text='Свежий пост автора')
+
+    def test_digests(self):
+        """Дайджест получают участники группы и подписчики автора."""
+        since = timezone.now() - timedelta(days=1)
+        self.assertEqual(
+            {user.username: posts for user, posts in digests.digests(since)},
+            {'member': [self.post], 'reader': [self.post]})
+
+    def test_send_digests_command(self):
+        call_command('send_digests', stdout=StringIO())
+        jobs.run_pending()
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox),
+                         ['member@example.com', 'reader@example.com'])
+        self.assertIn(reverse('posts:post_detail',
+                              kwargs={'post_id': self.post.pk}),
+                      mail.outbox[0].body)
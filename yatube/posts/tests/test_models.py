@@ -1,5 +1,9 @@
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 
+from posts import counters
 from posts.models import Post, Group, User
 
 
@@ -51,3 +55,54 @@ class PostModelTest(TestCase):
             'group': 'Выберите группу',
         }
         self.forms_check(field_help_text, 'help_text')
+
+
+class PostCounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+        cls.other_group = Group.objects.create(
+            title='othergroup',
+            slug='othergroup',
+            description='Тестовый group для теста',
+        )
+
+    def assert_counts(self, total, author, group, other_group):
+        self.assertEqual(counters.total_posts_count(), total)
+        self.assertEqual(counters.author_posts_count(self.user), author)
+        self.assertEqual(counters.group_posts_count(self.group), group)
+        self.assertEqual(counters.group_posts_count(self.other_group),
+                         other_group)
+
+    def test_counters_follow_writes(self):
+        """Счётчики меняются при создании, переносе и удалении поста."""
+        Post.objects.create(author=self.user, text='Первый пост')
+        self.assert_counts(1, 1, 0, 0)
+        post = Post.objects.create(author=self.user, text='Второй пост',
+                                   group=self.group)
+        self.assert_counts(2, 2, 1, 0)
+        post.group = self.other_group
+        post.save()
+        self.assert_counts(2, 2, 0, 1)
+        post.delete()
+        self.assert_counts(1, 1, 0, 0)
+        self.assertFalse(counters.recount())
+
+    def test_recount_repairs_drift(self):
+        """recount_posts исправляет рассинхронизацию счётчиков."""
+        self.assert_counts(0, 0, 0, 0)
+        # bulk_create не отправляет сигналы
+        Post.objects.bulk_create(
+            Post(author=self.user, text='Пост', group=self.group)
+            for _ in range(3))
+        self.assert_counts(0, 0, 0, 0)
+        out = StringIO()
+        call_command('recount_posts', stdout=out)
+        self.assertIn('3 drifted', out.getvalue())
+        self.assert_counts(3, 3, 3, 0)
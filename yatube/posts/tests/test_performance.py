@@ -0,0 +1,85 @@
+import io
+import json
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import performance
+from posts.models import Post, User
+
+
+class YatubePerformanceTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='shuki')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        Post.objects.create(author=cls.user, text='Тестовый текст')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_server_timing(self):
+        """Ответ содержит Server-Timing с именем view, БД и шаблонами."""
+        response = self.guest_client.get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        self.assertIn('view;desc="posts:index"', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('tpl;dur=', timing)
+        self.assertIn('page_cache_misses;desc="1"', timing)
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertIn('page_cache_hits;desc="1"', response['Server-Timing'])
+
+    def test_histograms(self):
+        for _ in range(3):
+            self.guest_client.get(reverse('posts:index'))
+        self.guest_client.get(reverse('about:tech'))
+        stats = performance.stats()
+        self.assertEqual(stats['posts:index']['requests'], 3)
+        self.assertEqual(stats['posts:index']['cache_hits'], round(2 / 3, 2))
+        self.assertEqual(sum(stats['about:tech']['histogram'].values()), 1)
+        self.assertGreater(stats['posts:index']['db_queries'], 0)
+        out = io.StringIO()
+        call_command('performance_stats', '--json', '--reset', stdout=out)
+        self.assertEqual(json.loads(out.getvalue())['about:tech']['requests'],
+                         1)
+        self.assertEqual(performance.stats(), {})
+
+    def test_streamed_page(self):
+        """Потоковая страница учитывается вместе с телом ответа."""
+        # первый запрос заводит счётчики постов
+        self.guest_client.get(reverse('posts:index'))
+        cache.clear()
+        self.guest_client.get(reverse('posts:index'))
+        rendered = performance.stats()['posts:index']
+        cache.clear()
+        with self.settings(STREAMING_FEEDS=True):
+            response = self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(performance.stats(), {})
+        b''.join(response.streaming_content)
+        streamed = performance.stats()['posts:index']
+        self.assertEqual(streamed['requests'], 1)
+        self.assertEqual(streamed['db_queries'], rendered['db_queries'])
+        self.assertGreater(streamed['template_ms'], 0)
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=0)
+    def test_not_sampled(self):
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.assertEqual(performance.stats(), {})
+
+    def test_staff_endpoint(self):
+        url = reverse('core:performance')
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        staff_client = Client()
+        staff_client.force_login(self.staff)
+        staff_client.get(reverse('about:author'))
+        response = staff_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('about:author', response.json())
@@ -0,0 +1,65 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import querylog
+from posts import views
+from posts.models import Post, User
+
+
+class YatubeQueryLogTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for i in range(6):
+            user = User.objects.create_user(username=f'user_{i}')
+            Post.objects.create(author=user, text=f'Тестовый текст {i}')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_fingerprint(self):
+        """Запросы одной формы с разными литералами совпадают."""
+        self.assertEqual(
+            querylog.fingerprint("SELECT * FROM t WHERE id IN (%s, %s) "
+                                 "AND name = 'x'  LIMIT 21"),
+            querylog.fingerprint('SELECT * FROM t WHERE id IN (%s)\n'
+                                 "AND name = 'it''s' LIMIT 10"),
+        )
+
+    def test_n_plus_one_in_template(self):
+        """Обход post.author в цикле шаблона отмечается как N+1."""
+        template = Template('{% for post in posts %}'
+                            '{{ post.author.username }}{% endfor %}')
+        with querylog.QueryInspector('test') as inspector:
+            template.render(Context({'posts': Post.objects.all()}))
+        suspects = inspector.suspects()
+        self.assertEqual(len(suspects), 1)
+        shape, times, stack = suspects[0]
+        self.assertEqual(times, 6)
+        self.assertIn('auth_user', shape)
+        self.assertTrue(any('post.author.username' in entry
+                            for entry in stack))
+        with self.assertLogs('core.querylog', 'WARNING') as logs:
+            inspector.report()
+        self.assertIn('Possible N+1 in test', logs.output[0])
+
+    def test_feed_has_no_n_plus_one(self):
+        with querylog.QueryInspector('index') as inspector:
+            self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(inspector.suspects(), [])
+
+    @override_settings(QUERY_INSPECTION=True, QUERY_BUDGET_STRICT=False)
+    def test_query_budget(self):
+        with mock.patch.object(views.index, 'query_budget', 1):
+            with self.assertLogs('core.querylog', 'ERROR') as logs:
+                self.guest_client.get(reverse('posts:index'))
+            self.assertIn('posts:index ran', logs.output[0])
+            cache.clear()
+            with override_settings(QUERY_BUDGET_STRICT=True):
+                with self.assertRaises(querylog.QueryBudgetExceeded):
+                    self.guest_client.get(reverse('posts:index'))
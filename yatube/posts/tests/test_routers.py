@@ -0,0 +1,101 @@
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Group, Post, User
+
+
+def sync_replica(source='default', target='replica'):
+    """Copies the whole primary database over the replica."""
+
+    for alias in (source, target):
+        connections[alias].ensure_connection()
+    connections[source].connection.backup(connections[target].connection)
+
+
+@override_settings(READ_REPLICA='replica')
+class YatubeReplicaRouterTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='shuki')
+        self.other = User.objects.create_user(username='other')
+        self.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+        Post.objects.create(author=self.user, text='Старый пост',
+                            group=self.group)
+        counters.recount()
+        sync_replica()
+        # записи выше давно дошли бы до реплики
+        cache.clear()
+        self.guest_client = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def feed_texts(self, client, url):
+        response = client.get(url)
+        return [post.text for post in response.context['page_obj']]
+
+    def test_writes_go_to_primary(self):
+        self.author_client.post(reverse('posts:post_create'),
+                                {'text': 'Новый пост'})
+        self.assertTrue(Post.objects.using('default')
+                        .filter(text='Новый пост').exists())
+        self.assertFalse(Post.objects.using('replica')
+                         .filter(text='Новый пост').exists())
+
+    def test_feeds_read_replica(self):
+        """Гости читают ленты с реплики, пока она не догонит основную."""
+        Post.objects.create(author=self.user, text='Новый пост',
+                            group=self.group)
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'shuki'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.feed_texts(self.guest_client, url),
+                                 ['Старый пост'])
+        sync_replica()
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.feed_texts(self.guest_client, url),
+                                 ['Новый пост', 'Старый пост'])
+
+    def test_lagging_reads_not_cached(self):
+        """Устаревшая страница с реплики не остаётся в кеше после записи."""
+        url = reverse('posts:index')
+        Post.objects.create(author=self.user, text='Новый пост',
+                            group=self.group)
+        self.assertNotIn('Новый пост',
+                         self.guest_client.get(url).content.decode())
+        sync_replica()
+        response = self.guest_client.get(url)
+        self.assertIn('Новый пост', response.content.decode())
+        # Когда реплика заведомо догнала, страница снова кешируется
+        cache.delete_many(['page_bumped:all', 'page_bumped:index'])
+        self.guest_client.get(url)
+        with self.assertNumQueries(0, using='replica'):
+            response = self.guest_client.get(url)
+        self.assertIn('Новый пост', response.content.decode())
+
+    def test_author_reads_own_write(self):
+        """Автор сразу видит свой пост, читая с основной базы."""
+        self.author_client.post(reverse('posts:post_create'),
+                                {'text': 'Новый пост'})
+        url = reverse('posts:profile', kwargs={'username': 'shuki'})
+        self.assertEqual(self.feed_texts(self.author_client, url),
+                         ['Новый пост', 'Старый пост'])
+        sync_replica()
+        Post.objects.create(author=self.user, text='Ещё пост')
+        other_client = Client()
+        other_client.force_login(self.other)
+        self.assertNotIn('Ещё пост', self.feed_texts(other_client, url))
+        self.assertIn('Ещё пост', self.feed_texts(self.author_client, url))
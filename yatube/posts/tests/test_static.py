@@ -0,0 +1,96 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core import checks, staticfiles
+
+
+class YatubeStaticChecksTests(SimpleTestCase):
+    def test_repo_templates(self):
+        """Шаблоны проекта ссылаются на статику только через static."""
+        self.assertEqual(checks.check_static_references(), [])
+
+    def test_unhashed_references(self):
+        with tempfile.TemporaryDirectory() as templates_dir:
+            with open(os.path.join(templates_dir, 'bad.html'), 'w') as bad:
+                bad.write("{% load static %}\n"
+                          "<link rel='stylesheet' href='/static/css/a.css'>\n"
+                          "<img src=\"{% static 'img/missing.png' %}\">\n")
+            templates = [{
+                'BACKEND': 'django.template.backends.django.DjangoTemplates',
+                'DIRS': [templates_dir],
+            }]
+            with self.settings(TEMPLATES=templates):
+                errors = checks.check_static_references()
+        self.assertEqual([error.id for error in errors],
+                         ['core.E001', 'core.E002'])
+        self.assertIn('bad.html:2', errors[0].msg)
+
+
+class YatubeStaticPipelineTests(SimpleTestCase):
+    allow_database_queries = True
+
+    def setUp(self):
+        self.bundles_dir = tempfile.mkdtemp()
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.bundles_dir, True)
+        self.addCleanup(shutil.rmtree, self.static_root, True)
+
+    def test_bundle(self):
+        """Бандл собирается из исходных таблиц стилей."""
+        with self.settings(STATIC_BUNDLES_DIR=self.bundles_dir):
+            path = finders.find('css/yatube.css')
+            with open(path) as bundle:
+                content = bundle.read()
+        self.assertIn('/* css/bootstrap.min.css */', content)
+        self.assertIn('/* css/color_red.css */', content)
+        self.assertTrue(path.startswith(self.bundles_dir))
+
+    def collect(self):
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_manifest_and_serve(self):
+        """Хешированные имена, сжатые варианты и долгий Cache-Control."""
+        with override_settings(
+                STATIC_BUNDLES_DIR=self.bundles_dir,
+                STATIC_ROOT=self.static_root,
+                STATICFILES_STORAGE=(
+                    'core.staticfiles.CompressedManifestStorage')):
+            self.collect()
+            hashed = staticfiles_storage.stored_name('css/yatube.css')
+            self.assertRegex(hashed, r'^css/yatube\.[0-9a-f]{12}\.css$')
+            with open(os.path.join(self.static_root, hashed + '.gz'),
+                      'rb') as compressed:
+                self.assertIn(b'color_red', gzip.decompress(
+                    compressed.read()))
+            cache.clear()
+            page = self.client.get(reverse('about:tech')).content.decode()
+            self.assertIn(f'/static/{hashed}', page)
+
+            factory = RequestFactory()
+            response = staticfiles.serve(
+                factory.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate'),
+                hashed)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+            self.assertEqual(response['Content-Type'], 'text/css')
+            self.assertIn('immutable', response['Cache-Control'])
+            self.assertIn('max-age=31536000', response['Cache-Control'])
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+            response.close()
+
+            response = staticfiles.serve(factory.get('/'), 'css/yatube.css')
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertEqual(response['Cache-Control'],
+                             'public, max-age=60')
+            response.close()
+            with self.assertRaises(Http404):
+                staticfiles.serve(factory.get('/'), '../manage.py')
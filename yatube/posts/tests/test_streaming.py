@@ -0,0 +1,205 @@
+import gzip
+import zlib
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (Client, RequestFactory, SimpleTestCase, TestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import compression, jobs
+from core.querylog import QueryBudgetExceeded
+from posts import timelines, views
+from posts.models import Group, Post, User
+
+
+PAGE = ('<p>Пост ленты</p>\n' * 200).encode()
+
+
+@override_settings(RESPONSE_COMPRESSION_ENCODINGS=('gzip',))
+class YatubeCompressionTests(SimpleTestCase):
+    def compressed(self, response, accept='gzip, deflate'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=accept)
+        return compression.compress_response(request, response)
+
+    def test_negotiate(self):
+        cases = {
+            'gzip, deflate, br': 'gzip',
+            'deflate;q=1.0, gzip;q=0.5': 'gzip',
+            'gzip;q=0': None,
+            'gzip;q=0, *': None,
+            '*': 'gzip',
+            'identity': None,
+            '': None,
+        }
+        for header, encoding in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(compression.negotiate(header), encoding)
+
+    def test_compress(self):
+        response = self.compressed(HttpResponse(PAGE))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), PAGE)
+        self.assertEqual(response['Content-Length'],
+                         str(len(response.content)))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_not_accepted(self):
+        response = self.compressed(HttpResponse(PAGE), accept='')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, PAGE)
+        # кеши не должны отдавать несжатый ответ вместо сжатого
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_skipped(self):
+        """Маленькие, уже сжатые и бинарные ответы не сжимаются."""
+        encoded = HttpResponse(PAGE)
+        encoded['Content-Encoding'] = 'br'
+        no_transform = HttpResponse(PAGE)
+        no_transform['Cache-Control'] = 'no-transform'
+        responses = {
+            'small': HttpResponse(b'<p>short</p>'),
+            'encoded': encoded,
+            'image': HttpResponse(PAGE, content_type='image/png'),
+            'no-transform': no_transform,
+        }
+        for name, response in responses.items():
+            with self.subTest(name=name):
+                original = response.get('Content-Encoding')
+                response = self.compressed(response)
+                self.assertEqual(response.get('Content-Encoding'), original)
+                self.assertEqual(response.content, PAGE
+                                 if name != 'small' else b'<p>short</p>')
+
+    def test_weak_etag(self):
+        response = HttpResponse(PAGE)
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.compressed(response)['ETag'], 'W/"abc"')
+
+    def test_stream(self):
+        """Каждый кусок потока можно распаковать, не дожидаясь конца."""
+        chunks = [PAGE[:1000], b'', PAGE[1000:]]
+        response = self.compressed(StreamingHttpResponse(iter(chunks)))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        output = iter(response.streaming_content)
+        self.assertEqual(decompressor.decompress(next(output)), chunks[0])
+        rest = b''.join(decompressor.decompress(part) for part in output)
+        self.assertEqual(rest, chunks[2])
+        self.assertTrue(decompressor.eof)
+
+
+class YatubeStreamingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='shuki')
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup',
+            description='Тестовый group для теста',
+        )
+        cls.post = Post.objects.create(author=cls.author,
+                                       text='Потоковый пост',
+                                       group=cls.group)
+        timelines.follow(cls.user, cls.author)
+        jobs.run_pending()
+
+    def setUp(self):
+        # Страницы ленты кешируются для гостей
+        cache.clear()
+        self.client = Client()
+
+    def feed_urls(self):
+        return (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile',
+                    kwargs={'username': self.author.username}),
+        )
+
+    @override_settings(STREAMING_FEEDS=True)
+    def test_head_before_posts(self):
+        """Шапка страницы уходит до того, как прочитаны посты."""
+        for url in self.feed_urls():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response.streaming)
+                chunks = iter(response.streaming_content)
+                with CaptureQueriesContext(connection) as queries:
+                    head = next(chunks).decode()
+                self.assertIn('</head>', head)
+                self.assertNotIn('Потоковый пост', head)
+                self.assertFalse([query for query in queries
+                                  if '"posts_post"' in query['sql']])
+                self.assertIn('Потоковый пост', b''.join(chunks).decode())
+
+    def test_same_page(self):
+        for url in self.feed_urls():
+            with self.subTest(url=url):
+                rendered = self.client.get(url).content
+                cache.clear()
+                with self.settings(STREAMING_FEEDS=True):
+                    streamed = self.client.get(url)
+                self.assertEqual(b''.join(streamed.streaming_content),
+                                 rendered)
+                cache.clear()
+
+    @override_settings(STREAMING_FEEDS=True)
+    def test_follow_index(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertIn('Потоковый пост',
+                      b''.join(response.streaming_content).decode())
+
+    @override_settings(STREAMING_FEEDS=True)
+    def test_missing_group(self):
+        response = self.client.get(reverse('posts:group_list',
+                                           kwargs={'slug': 'missing'}))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(STREAMING_FEEDS=True)
+    def test_page_cache(self):
+        """Отправленная целиком страница попадает в кеш для гостей."""
+        url = reverse('posts:index')
+        page = b''.join(self.client.get(url).streaming_content)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content, page)
+
+    @override_settings(STREAMING_FEEDS=True, QUERY_INSPECTION=True,
+                       QUERY_BUDGET_STRICT=True)
+    def test_query_budget(self):
+        """Запросы, сделанные при отправке страницы, входят в бюджет."""
+        with mock.patch.object(views.index, 'query_budget', 1):
+            response = self.client.get(reverse('posts:index'))
+            with self.assertRaises(QueryBudgetExceeded):
+                b''.join(response.streaming_content)
+
+    @override_settings(STREAMING_FEEDS=True,
+                       RESPONSE_COMPRESSION_ENCODINGS=('gzip',))
+    def test_compressed_stream(self):
+        response = self.client.get(reverse('posts:index'),
+                                   HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        page = gzip.decompress(b''.join(response.streaming_content))
+        self.assertIn('Потоковый пост', page.decode())
+
+    @override_settings(STREAMING_FEEDS=True,
+                       RESPONSE_COMPRESSION_ENCODINGS=('gzip',))
+    def test_compressed_stream_cached(self):
+        """В кеш попадает несжатая страница без Content-Encoding."""
+        url = reverse('posts:index')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        page = gzip.decompress(b''.join(response.streaming_content))
+        cached = self.client.get(url)
+        self.assertFalse(cached.streaming)
+        self.assertFalse(cached.has_header('Content-Encoding'))
+        self.assertEqual(cached.content, page)
+        compressed = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), page)
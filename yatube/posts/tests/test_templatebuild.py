@@ -0,0 +1,67 @@
+import io
+import re
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import templatebuild
+from posts.models import Group, Post, User
+
+
+def _normalize(html):
+    return re.sub(r'\s+', ' ', html).strip()
+
+
+class YatubeTemplateBuildTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='shuki')
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+        for i in range(3):
+            Post.objects.create(author=cls.user, text=f'Тестовый текст {i}',
+                                group=cls.group if i % 2 else None)
+
+    def setUp(self):
+        cache.clear()
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir, ignore_errors=True)
+
+    def test_includes_inlined(self):
+        source = templatebuild.compile_template(
+            templatebuild.source_engine(), 'posts/index.html')
+        self.assertNotIn('{% include', source.replace(
+            "{% include 'includes/paginator.html' %}", ''))
+        self.assertIn('подробная информация', source)
+
+    def test_compiled_pages_render_the_same(self):
+        """Собранные шаблоны дают ту же страницу, что и исходные."""
+        call_command('compile_templates', f'--output={self.output_dir}',
+                     stdout=io.StringIO())
+        templates = [dict(settings.TEMPLATES[0])]
+        templates[0]['DIRS'] = [self.output_dir, *templates[0]['DIRS']]
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': 'shuki'}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                cache.clear()
+                expected = Client().get(url).content.decode()
+                cache.clear()
+                with override_settings(TEMPLATES=templates):
+                    compiled = Client().get(url)
+                self.assertTrue(compiled.templates[0].origin.name
+                                .startswith(self.output_dir))
+                self.assertEqual(_normalize(compiled.content.decode()),
+                                 _normalize(expected))
@@ -1,3 +1,4 @@
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
 
@@ -43,6 +44,8 @@ class YatubeURLTests(TestCase):
         }
 
     def setUp(self):
+        # Страницы ленты кешируются для гостей
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
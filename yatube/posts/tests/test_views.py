@@ -1,8 +1,20 @@
-from django.test import Client, TestCase
+import shutil
+import tempfile
+from http import HTTPStatus
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 
 from posts.models import Post, Group, User
+from posts import counters, page_cache
 from posts.forms import PostForm
+from posts.paginators import CursorPaginator
 from yatube.settings import POSTS_PER_PAGE
 
 
@@ -23,6 +35,8 @@ class YatubeViewsTests(TestCase):
             group=cls.group)
 
     def setUp(self):
+        # Страницы ленты кешируются для гостей
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -119,7 +133,7 @@ class YatubeViewsTests(TestCase):
                 response = self.authorized_client.get(reverse_name)
                 self.assertIsInstance(response.context['form'], PostForm)
                 self.assertEqual(list(response.context['form'].fields.keys()),
-                                 ['text', 'group'])
+                                 ['text', 'group', 'image'])
                 try:
                     self.assertTrue(response.context['is_edit'])
                 except:
@@ -149,6 +163,7 @@ class YatubePaginatorTests(TestCase):
             ])
 
     def setUp(self):
+        cache.clear()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
@@ -176,3 +191,401 @@ class YatubePaginatorTests(TestCase):
                     )
         self.test_paginator_check(response)
         self.assertEqual(response.context['post_count'], self.NUM_OF_POSTS)
+
+
+class YatubeQueryCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Каждый пост со своим автором и группой, чтобы ленивые
+        # обращения к связям в шаблонах давали отдельные запросы
+        cls.user = User.objects.create_user(username='shuki')
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+        cls.add_posts(range(3))
+
+    @classmethod
+    def add_posts(cls, numbers):
+        for i in numbers:
+            author = User.objects.create_user(username=f'author_{i}')
+            group = Group.objects.create(
+                title=f'group_{i}',
+                slug=f'group_{i}',
+                description='Тестовый group для теста',
+            )
+            Post.objects.create(author=author, text=f'Пост {i}', group=group)
+            Post.objects.create(author=cls.user, text=f'Пост {i}',
+                                group=cls.group)
+        # Счётчики постов заводятся при первом чтении, прогреваем их
+        counters.recount()
+
+    def setUp(self):
+        # Страницы ленты кешируются для гостей
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_feed_query_count(self):
+        """Число запросов ленты не зависит от количества постов."""
+        # Первый запрос - агрегат для ETag; на главной оба поста номера
+        urls_queries = {
+            reverse('posts:index'): (3, 2),
+            reverse('posts:group_list',
+                    kwargs={'slug': self.group.slug}): (4, 1),
+            reverse('posts:profile',
+                    kwargs={'username': self.user.username}): (4, 1),
+        }
+        # Неполная страница, затем полная со следующей
+        for posts in (3, POSTS_PER_PAGE + 1):
+            self.add_posts(range(Post.objects.filter(author=self.user)
+                                 .count(), posts))
+            cache.clear()
+            for url, (queries, per_number) in urls_queries.items():
+                with self.subTest(url=url, posts=posts):
+                    with self.assertNumQueries(queries):
+                        response = self.guest_client.get(url)
+                    self.assertEqual(len(response.context['page_obj']),
+                                     min(posts * per_number, POSTS_PER_PAGE))
+
+    def test_post_detail_query_count(self):
+        post = Post.objects.filter(author=self.user).first()
+        # Пост и счётчик читаются для ETag и ещё раз во view
+        with self.assertNumQueries(4):
+            self.guest_client.get(reverse('posts:post_detail',
+                                          kwargs={'post_id': post.pk}))
+
+
+@override_settings(CURSOR_PAGINATED_FEEDS=('index', 'group_list'))
+class YatubeCursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.NUM_OF_POSTS = POSTS_PER_PAGE * 2 + 3
+        cls.user = User.objects.create_user(username='shuki')
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+        # bulk_create даёт одинаковые pub_date - порядок держится на id
+        Post.objects.bulk_create(
+            [
+                Post(
+                    author=cls.user,
+                    text=f'Тестовый текст {i}',
+                    group=cls.group
+                )
+                for i in range(cls.NUM_OF_POSTS)
+            ])
+        cls.expected = list(Post.objects.order_by('-pub_date', '-id')
+                            .values_list('id', flat=True))
+
+    def setUp(self):
+        # Страницы ленты кешируются для гостей
+        cache.clear()
+        self.guest_client = Client()
+
+    def page_ids(self, response):
+        return [post.id for post in response.context['page_obj']]
+
+    def test_walks_feed_forward_and_back(self):
+        """Курсоры ведут по ленте без пропусков и повторов."""
+        url = reverse('posts:index')
+        response = self.guest_client.get(url)
+        page_obj = response.context['page_obj']
+        self.assertIsInstance(page_obj.paginator, CursorPaginator)
+        self.assertFalse(page_obj.has_previous())
+        pages = [self.page_ids(response)]
+        while page_obj.has_next():
+            response = self.guest_client.get(
+                url, {'cursor': page_obj.next_cursor})
+            page_obj = response.context['page_obj']
+            pages.append(self.page_ids(response))
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertEqual(len(pages[-1]), 3)
+        response = self.guest_client.get(
+            url, {'cursor': page_obj.previous_cursor})
+        self.assertEqual(self.page_ids(response), pages[-2])
+        self.assertContains(response, '?cursor=')
+
+    def test_no_count_query(self):
+        url = reverse('posts:group_list', kwargs={'slug': self.group.slug})
+        with CaptureQueriesContext(connection) as context:
+            self.guest_client.get(url)
+        # COUNT остаётся только в агрегате для ETag
+        counts = [query['sql'] for query in context.captured_queries
+                  if 'COUNT(' in query['sql'] and 'MAX(' not in query['sql']]
+        self.assertEqual(counts, [])
+        self.assertNotIn('OFFSET', context.captured_queries[-1]['sql'])
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        response = self.guest_client.get(reverse('posts:index'),
+                                         {'cursor': 'garbage!'})
+        self.assertEqual(self.page_ids(response),
+                         self.expected[:POSTS_PER_PAGE])
+
+    def test_page_mode_kept_for_other_views(self):
+        response = self.guest_client.get(
+            reverse('posts:profile', kwargs={'username': self.user}))
+        self.assertEqual(response.context['page_obj'].paginator.num_pages, 3)
+
+
+class YatubePostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='shuki')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст для теста',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def check_cards_cached_and_invalidated(self):
+        url = reverse('posts:index')
+        response = self.guest_client.get(url)
+        self.assertTemplateUsed(response, 'includes/post_item.html')
+        response = self.guest_client.get(url)
+        self.assertTemplateNotUsed(response, 'includes/post_item.html')
+        self.assertContains(response, 'Тестовый текст для теста')
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        self.assertContains(self.guest_client.get(url), 'Исправленный текст')
+        self.user.first_name = 'Шуки'
+        self.user.save()
+        self.assertContains(self.guest_client.get(url), 'Шуки')
+
+    def test_cards_with_locmem_cache(self):
+        """Карточки постов кешируются и сбрасываются при правке."""
+        self.check_cards_cached_and_invalidated()
+
+    def test_cards_with_file_cache(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        file_cache = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.filebased'
+                           '.FileBasedCache',
+                'LOCATION': cache_dir,
+            }
+        }
+        with self.settings(CACHES=file_cache):
+            self.check_cards_cached_and_invalidated()
+
+
+class YatubePageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='shuki')
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст для теста',
+            group=cls.group)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user}),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_guest_pages_cached_until_post_written(self):
+        """Гостям лента отдаётся из кеша до записи нового поста."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.guest_client.get(url)
+                with self.assertNumQueries(0):
+                    response = self.guest_client.get(url)
+                self.assertContains(response, 'Тестовый текст для теста')
+        Post.objects.create(author=self.user, text='Свежий пост',
+                            group=self.group)
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url),
+                                    'Свежий пост')
+
+    def test_group_rename_invalidates_all_pages(self):
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        self.group.title = 'renamed'
+        self.group.save()
+        self.assertContains(self.guest_client.get(url), 'renamed')
+
+    def test_authorized_pages_not_cached(self):
+        url = reverse('posts:index')
+        self.authorized_client.get(url)
+        response = self.authorized_client.get(url)
+        self.assertTemplateUsed(response, 'posts/index.html')
+
+    def test_stats(self):
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        self.guest_client.get(url)
+        self.guest_client.get(url, {'page': 2})
+        out = StringIO()
+        call_command('page_cache_stats', '--reset', stdout=out)
+        self.assertIn('hits: 1\nmisses: 2', out.getvalue())
+        self.assertEqual(page_cache.stats(), {'hits': 0, 'misses': 0})
+
+
+class YatubeConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='shuki')
+        cls.group = Group.objects.create(
+            title='supergroup',
+            slug='supergroup_8u8907272363',
+            description='Тестовый group для теста',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый текст для теста',
+            group=cls.group)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.user}),
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.pk}),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_not_modified_until_post_edited(self):
+        """Неизменившиеся страницы отдаются как 304 без шаблонов."""
+        etags = {}
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                etags[url] = response['ETag']
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+                self.assertFalse(response.templates)
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertContains(response, 'Исправленный текст')
+
+    def test_if_modified_since(self):
+        url = self.urls[-1]
+        last_modified = self.guest_client.get(url)['Last-Modified']
+        response = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_feeds_without_last_modified(self):
+        """Удаление нового поста меняет ленту, хотя даты в ней старше."""
+        older = Post.objects.create(author=self.user, text='Старый пост',
+                                    group=self.group)
+        newest = Post.objects.create(author=self.user, text='Новый пост',
+                                     group=self.group)
+        feeds = self.urls[:-1]
+        for url in feeds:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertFalse(response.has_header('Last-Modified'))
+        newest.delete()
+        for url in feeds:
+            with self.subTest(url=url):
+                response = self.guest_client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=http_date(
+                        older.modified.timestamp() + 1))
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertNotContains(response, 'Новый пост')
+
+    def test_etag_depends_on_viewer(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertNotEqual(self.guest_client.get(url)['ETag'],
+                                    self.authorized_client.get(url)['ETag'])
+
+
+class YatubeSearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='shuki')
+        cls.posts = Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Котики <b>и</b> собаки номер {i}')
+            for i in range(POSTS_PER_PAGE + 2))
+        # Чем чаще слово в коротком тексте, тем выше пост в выдаче
+        cls.best = Post.objects.create(author=cls.user,
+                                       text='Котики, котики и котики')
+        cls.other = Post.objects.create(author=cls.user,
+                                        text='Только собаки')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, **params):
+        return self.guest_client.get(reverse('posts:search'), params)
+
+    def test_ranked_results_with_snippets(self):
+        """Поиск находит посты, лучшие совпадения идут первыми."""
+        response = self.search(q='котики')
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj[0], self.best)
+        self.assertNotIn(self.other, page_obj)
+        self.assertEqual(len(page_obj), POSTS_PER_PAGE)
+        self.assertContains(response, '<mark>Котики</mark> &lt;b&gt;')
+        response = self.search(q='котики', cursor=page_obj.next_cursor)
+        self.assertEqual(len(response.context['page_obj']), 3)
+        self.assertContains(response, 'q=%D0%BA%D0%BE%D1%82%D0%B8%D0%BA%D0%B8'
+                                      '&amp;cursor=')
+
+    def test_index_follows_edits_and_deletes(self):
+        self.other.text = 'Только хомячки'
+        self.other.save()
+        self.assertEqual(list(self.search(q='хомячки').context['page_obj']),
+                         [self.other])
+        self.other.delete()
+        self.assertFalse(self.search(q='хомячки').context['page_obj'])
+
+    def test_query_syntax_is_escaped(self):
+        for query in ('"котики', 'котики OR', 'NEAR(', '*', ''):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(q=query).status_code,
+                                 HTTPStatus.OK)
+
+    def test_admin_search_uses_index(self):
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        self.guest_client.force_login(admin)
+        response = self.guest_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'хомячки собаки'})
+        self.assertEqual(response.context['cl'].result_count, 0)
+        response = self.guest_client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'только'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.other])
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO posts_post_fts(posts_post_fts) "
+                           "VALUES ('delete-all')")
+        self.assertFalse(self.search(q='собаки').context['page_obj'])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertTrue(self.search(q='собаки').context['page_obj'])
@@ -0,0 +1,165 @@
+"""Follow feeds precomputed on write.
+
+A new post is copied into the timeline of every follower of its author
+(fan-out on write), so the follow feed reads one user's entries instead
+of the posts of everyone they follow. Authors with more than
+TIMELINE_FANOUT_LIMIT followers would turn a single post into that many
+inserts; their follows are marked fan_out_on_read and the feed adds
+their posts by author when it is read. Only the newest TIMELINE_LENGTH
+entries of a timeline are shown; trim() deletes the older ones, in a
+job queued TIMELINE_TRIM_DELAY after entries are added.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Job
+from .models import Follow, Post, TimelineEntry
+
+
+TRIM_SQL = '''
+    DELETE FROM {table} WHERE id IN (
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (
+                PARTITION BY owner_id ORDER BY pub_date DESC, post_id DESC
+            ) AS position
+            FROM {table}
+        ) AS ranked
+        WHERE position > %s
+    )
+'''
+
+
+def _push(owner_ids, posts):
+    """Adds (post_id, pub_date) pairs to the timelines of owner_ids."""
+
+    TimelineEntry.objects.bulk_create(
+        (TimelineEntry(owner_id=owner_id, post_id=post_id, pub_date=pub_date)
+         for owner_id in owner_ids for post_id, pub_date in posts),
+        batch_size=500, ignore_conflicts=True)
+    if owner_ids and posts:
+        schedule_trim()
+
+
+def schedule_trim():
+    """Queues a trim unless one is already waiting.
+
+    One trim goes over every timeline, so the posts of the next
+    TIMELINE_TRIM_DELAY seconds share it.
+    """
+
+    from . import tasks
+
+    trim_timelines = tasks.trim_timelines
+    name = f'{trim_timelines.__module__}.{trim_timelines.__qualname__}'
+    if not Job.objects.filter(task=name, status=Job.QUEUED).exists():
+        trim_timelines.delay_until(
+            timezone.now() + timedelta(seconds=settings.TIMELINE_TRIM_DELAY))
+
+
+def backfill(owner_ids, author_id):
+    """Copies the newest posts of the author into the timelines."""
+
+    posts = list(Post.objects.filter(author_id=author_id)
+                 .order_by('-pub_date', '-id')
+                 .values_list('id', 'pub_date')[:settings.TIMELINE_LENGTH])
+    _push(owner_ids, posts)
+
+
+def fan_out(post):
+    """Pushes a new post to the followers, returns how many got it."""
+
+    followers = list(Follow.objects.filter(author_id=post.author_id)
+                     .values_list('user_id', 'fan_out_on_read'))
+    if any(on_read for _, on_read in followers):
+        return 0
+    _push([user_id for user_id, _ in followers], [(post.pk, post.pub_date)])
+    return len(followers)
+
+
+def follow(user, author):
+    """Subscribes user to author, False when already subscribed."""
+
+    with transaction.atomic():
+        _, created = Follow.objects.get_or_create(user=user, author=author)
+        if not created:
+            return False
+        follows = Follow.objects.filter(author=author)
+        if follows.count() > settings.TIMELINE_FANOUT_LIMIT:
+            follows.filter(fan_out_on_read=False).update(fan_out_on_read=True)
+        else:
+            backfill([user.pk], author.pk)
+    return True
+
+
+def unfollow(user, author):
+    """Unsubscribes user from author, False when not subscribed.
+
+    An author falling back under the limit gets their recent posts
+    copied into the timelines they were read around, in a job.
+    """
+
+    from . import tasks
+
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+        if not deleted:
+            return False
+        TimelineEntry.objects.filter(owner=user, post__author=author).delete()
+        follows = Follow.objects.filter(author=author)
+        if (follows.count() <= settings.TIMELINE_FANOUT_LIMIT
+                and follows.filter(fan_out_on_read=True).exists()):
+            follows.update(fan_out_on_read=False)
+            tasks.backfill_followers.delay(author_id=author.pk)
+    return True
+
+
+def backfill_followers(author_id):
+    """Copies the author's recent posts to followers reading on write."""
+
+    follows = Follow.objects.filter(author_id=author_id)
+    if follows.filter(fan_out_on_read=True).exists():
+        # over the limit again since the job was queued
+        return
+    backfill(list(follows.values_list('user_id', flat=True)), author_id)
+
+
+def feed(user):
+    """Posts of the follow feed of user, newest first."""
+
+    entries = (TimelineEntry.objects.filter(owner=user)
+               .order_by('-pub_date', '-post_id')
+               .values('post_id')[:settings.TIMELINE_LENGTH])
+    read_authors = (Follow.objects.filter(user=user, fan_out_on_read=True)
+                    .values('author_id'))
+    return Post.objects.feed().filter(
+        Q(pk__in=entries) | Q(author__in=read_authors))
+
+
+def trim():
+    """Deletes entries past TIMELINE_LENGTH, returns how many."""
+
+    with connection.cursor() as cursor:
+        cursor.execute(TRIM_SQL.format(
+            table=connection.ops.quote_name(TimelineEntry._meta.db_table)),
+            [settings.TIMELINE_LENGTH])
+        return cursor.rowcount
+
+
+def rebuild():
+    """Recomputes the fan_out_on_read marks and refills every timeline."""
+
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+        authors = (Follow.objects.order_by().values_list('author_id')
+                   .distinct())
+        for author_id, in authors:
+            follows = Follow.objects.filter(author_id=author_id)
+            on_read = follows.count() > settings.TIMELINE_FANOUT_LIMIT
+            follows.update(fan_out_on_read=on_read)
+            if not on_read:
+                backfill(list(follows.values_list('user_id', flat=True)),
+                         author_id)
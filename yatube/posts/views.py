@@ -1,79 +1,221 @@
+from functools import partial
+from urllib.parse import urlencode
+
 from django.shortcuts import render, get_object_or_404, redirect
-from django.core.paginator import Paginator
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import get_user_model
-
-from .models import Post, Group
+from django.conf import settings
+from django.db import transaction
+from django.http import (Http404, HttpResponseBadRequest,
+                         StreamingHttpResponse)
+from django.utils.functional import SimpleLazyObject
+
+from . import counters, export, page_cache, timelines
+from .models import Follow, Post, Group
+from .conditional import feed_condition, post_condition, post_state
 from .forms import PostForm
+from .page_cache import cache_anonymous_page
+from .paginators import CountedPaginator, CursorPaginator
+from .search import SearchPaginator
+from core.concurrency import gather
+from core.querylog import query_budget
+from core.routers import replica_reads
+from core.streaming import stream
 from yatube.settings import POSTS_PER_PAGE
 
 
 User = get_user_model()
 
 
-def _pagination(request, selector, count=POSTS_PER_PAGE):
-    paginator = Paginator(selector, count)
+def _pagination(request, selector, counter, count=POSTS_PER_PAGE):
+    """Pages the feed by number or, for views listed in
+    CURSOR_PAGINATED_FEEDS, by keyset cursor.
+
+    The total number of posts is taken from counter() when needed.
+    """
+
+    if request.resolver_match.url_name in settings.CURSOR_PAGINATED_FEEDS:
+        paginator = CursorPaginator(selector, count, counter)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = CountedPaginator(selector, count, counter)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
+def _render_feed(request, template, context):
+    """Streams the feed page with STREAMING_FEEDS, renders it otherwise.
+
+    The page of posts is read when the template gets to it, after the
+    head of a streamed page has been sent.
+    """
+
+    if settings.STREAMING_FEEDS:
+        return stream(request, template, context)
+    return render(request, template, context)
+
+
+@query_budget(12)
+@replica_reads
+@feed_condition(page_cache.index_scope, lambda: {})
+@cache_anonymous_page(page_cache.index_scope)
 def index(request):
     """Main page - dispalying the latest ten posts."""
 
     template = 'posts/index.html'
-    posts = Post.objects.all()
-    page_obj = _pagination(request, posts)
+    posts = Post.objects.feed()
+    page_obj = SimpleLazyObject(
+        partial(_pagination, request, posts, counters.total_posts_count))
     context = {
         'page_obj': page_obj
     }
-    return render(request, template, context)
+    return _render_feed(request, template, context)
 
 
+@query_budget(12)
+@replica_reads
+@feed_condition(page_cache.group_scope,
+                lambda slug: {'group__slug': slug})
+@cache_anonymous_page(page_cache.group_scope)
 def group_posts(request, slug):
     """Filters by group and displays posts by ten per page."""
 
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    posts_by_group = group.posts.all()
+    posts_by_group = group.posts.feed()
     context = {
         'group': group,
-        'page_obj': _pagination(request, posts_by_group),
+        'page_obj': SimpleLazyObject(partial(
+            _pagination, request, posts_by_group,
+            partial(counters.group_posts_count, group)
+        )),
     }
-    return render(request, template, context)
+    return _render_feed(request, template, context)
 
 
+@query_budget(12)
+@replica_reads
+@feed_condition(page_cache.profile_scope,
+                lambda username: {'author__username': username})
+@cache_anonymous_page(page_cache.profile_scope)
 def profile(request, username):
     """Filters by author and displays posts by ten per page."""
 
     template = 'posts/profile.html'
     author = get_object_or_404(User, username=username)
-    posts_by_author = author.posts.all()
+    posts_by_author = author.posts.feed()
+    following = (request.user.is_authenticated
+                 and Follow.objects.filter(user=request.user,
+                                           author=author).exists())
+    # shown in the header, read before the head of the page is sent
+    posts_count = counters.author_posts_count(author)
     context = {
         'author': author,
-        'page_obj': _pagination(request, posts_by_author),
+        'following': following,
+        'posts_count': posts_count,
+        'page_obj': SimpleLazyObject(partial(
+            _pagination, request, posts_by_author, lambda: posts_count
+        )),
     }
-    return render(request, template, context)
+    return _render_feed(request, template, context)
+
+
+@query_budget(12)
+@login_required(redirect_field_name=None)
+def follow_index(request):
+    """Posts of the followed authors from the user's timeline."""
+
+    template = 'posts/follow.html'
+    paginator = CursorPaginator(timelines.feed(request.user), POSTS_PER_PAGE)
+    context = {
+        'page_obj': SimpleLazyObject(
+            partial(paginator.get_page, request.GET.get('cursor'))),
+    }
+    return _render_feed(request, template, context)
+
+
+@login_required(redirect_field_name=None)
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        timelines.follow(request.user, author)
+    return redirect('posts:profile', username=username)
+
+
+@login_required(redirect_field_name=None)
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    timelines.unfollow(request.user, author)
+    return redirect('posts:profile', username=username)
 
 
+@query_budget(12)
+@post_condition
 def post_detail(request, post_id):
     """Filters by author and displays posts by ten per page."""
 
     template = 'posts/post_detail.html'
-    post_by_text_id = get_object_or_404(Post, pk=post_id)
+    state = post_state(request, post_id)
+    if state is None:
+        raise Http404('No Post matches the given query.')
+    post_by_text_id, post_count = gather(
+        lambda: get_object_or_404(
+            Post.objects.select_related('author', 'group'), pk=post_id),
+        partial(counters.author_posts_count, User(pk=state['author_id'])),
+    )
     context = {
         'post_by_text_id': post_by_text_id,
-        'post_count': post_by_text_id.author.posts.count()
+        'post_count': post_count,
     }
     return render(request, template, context)
 
 
+@query_budget(8)
+def search(request):
+    """Full-text search over posts, best matches first."""
+
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    paginator = SearchPaginator(query, POSTS_PER_PAGE)
+    context = {
+        'query': query,
+        'page_obj': paginator.get_page(request.GET.get('cursor')),
+        'page_query': urlencode({'q': query}),
+    }
+    return render(request, template, context)
+
+
+@staff_member_required
+def export_posts(request):
+    """Streams the filtered posts as NDJSON or CSV for staff."""
+
+    export_format = request.GET.get('format', 'ndjson')
+    if export_format not in export.FORMATS:
+        return HttpResponseBadRequest('format must be ndjson or csv')
+    try:
+        since = export.parse_day(request.GET.get('since'))
+        until = export.parse_day(request.GET.get('until'))
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    queryset = export.posts_for_export(request.GET.get('group'),
+                                       request.GET.get('author'),
+                                       since, until)
+    response = StreamingHttpResponse(
+        export.lines(export_format, queryset),
+        content_type=f'{export.FORMATS[export_format]}; charset=utf-8')
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{export_format}"')
+    return response
+
+
 @login_required(redirect_field_name=None)
 def post_create(request):
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        post.save()
+        with transaction.atomic():
+            post.save()
         return redirect('posts:profile', username=request.user)
     return render(request, 'posts/post_create.html', {'form': form})
 
@@ -82,11 +224,13 @@ def post_create(request):
 def post_edit(request, post_id):
 
     post = get_object_or_404(Post, pk=post_id)
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(request.POST or None, files=request.FILES or None,
+                    instance=post)
     if post.author != request.user:
         return redirect('posts:post_detail', post_id)
     if form.is_valid():
-        form.save()
+        with transaction.atomic():
+            form.save()
         return redirect('posts:post_detail', post_id)
     return render(request,
                   'posts/post_create.html',
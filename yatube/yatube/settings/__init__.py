@@ -0,0 +1,23 @@
+"""Settings of the profile named by the YATUBE_ENV environment variable.
+
+dev (the default) is for working on the project, test for running the
+test suites and prod for serving it. DJANGO_SETTINGS_MODULE may also
+name a profile module such as yatube.settings.prod directly.
+"""
+import os
+from importlib import import_module
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+PROFILES = ('dev', 'test', 'prod')
+
+PROFILE = os.environ.get('YATUBE_ENV', 'dev')
+
+if PROFILE not in PROFILES:
+    raise ImproperlyConfigured(
+        f'YATUBE_ENV must be one of {", ".join(PROFILES)}, not {PROFILE!r}')
+
+_profile = import_module(f'{__name__}.{PROFILE}')
+globals().update({name: value for name, value in vars(_profile).items()
+                  if name.isupper()})
@@ -0,0 +1,353 @@
+"""
+Django settings for yatube project shared by every profile.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = '3tb(i-w&v0sc7$&24$&7peec&kd5e^#klh%_!j(foy7@sg58*m'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+# Turned on by the dev profile
+DEBUG = False
+
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost', 'testserver']
+
+# Application definition
+
+INSTALLED_APPS = [
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.PerformanceMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.QueryInspectionMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
+
+# Templates with their includes inlined by manage.py compile_templates
+COMPILED_TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates_compiled')
+
+COMPILED_TEMPLATES = [
+    'posts/index.html',
+    'posts/group_list.html',
+    'posts/profile.html',
+    'posts/follow.html',
+    'includes/post_item.html',
+]
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+            'loaders': TEMPLATE_LOADERS,
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'core.backends.sqlite3',
+        'NAME': os.environ.get('YATUBE_DATABASE_PATH',
+                               os.path.join(BASE_DIR, 'db.sqlite3')),
+    }
+}
+
+# Copy of default the feed listings read from when READ_REPLICA names
+# it; without YATUBE_REPLICA_DATABASE_PATH it is the same file. Tests
+# get a separate database for it.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': os.environ.get('YATUBE_REPLICA_DATABASE_PATH',
+                           DATABASES['default']['NAME']),
+}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+READ_REPLICA = None
+
+# How long after a write its author keeps reading from default
+REPLICA_STICKY_SECONDS = 15
+
+# Threads running the independent queries of a view, such as a feed
+# page and its total, next to the request thread; 0 runs them in turn
+CONCURRENT_QUERY_WORKERS = 0
+
+# Set on every new SQLite connection by core.db.configure_sqlite. With
+# WAL readers no longer block the writer nor it them, NORMAL only syncs
+# at checkpoints, and writers wait up to busy_timeout ms for the lock
+# instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    # negative: in KiB
+    'cache_size': -64 * 1024,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Mail is stored by core.mail.OutboxBackend and sent by a job through
+# EMAIL_DELIVERY_BACKEND in batches of EMAIL_OUTBOX_BATCH_SIZE over one
+# connection; a refused message is retried EMAIL_OUTBOX_MAX_ATTEMPTS
+# times, first after EMAIL_OUTBOX_RETRY_DELAY seconds, then doubling
+EMAIL_BACKEND = 'core.mail.OutboxBackend'
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+EMAIL_OUTBOX_BATCH_SIZE = 50
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+EMAIL_OUTBOX_RETRY_DELAY = 60
+
+# Absolute links in emails
+SITE_URL = os.environ.get('YATUBE_SITE_URL', 'http://127.0.0.1:8000')
+
+# Posts listed in one digest email (send_digests)
+DIGEST_MAX_POSTS = 20
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+# collectstatic target, served by the web server or with SERVE_STATIC
+STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
+
+STATICFILES_FINDERS = [
+    'django.contrib.staticfiles.finders.FileSystemFinder',
+    'django.contrib.staticfiles.finders.AppDirectoriesFinder',
+    'core.staticfiles.BundleFinder',
+]
+
+# Stylesheets concatenated into one file each, built into
+# STATIC_BUNDLES_DIR by core.staticfiles.BundleFinder
+STATIC_BUNDLES = {
+    'css/yatube.css': ('css/bootstrap.min.css', 'css/color_red.css'),
+}
+
+STATIC_BUNDLES_DIR = os.path.join(BASE_DIR, '.cache', 'static_bundles')
+
+# Serve STATIC_ROOT from Django (core.staticfiles.serve) when no web
+# server does; hashed names are cached for STATIC_MAX_AGE seconds,
+# names missing from the manifest for STATIC_UNHASHED_MAX_AGE
+SERVE_STATIC = False
+
+STATIC_MAX_AGE = 60 * 60 * 24 * 365
+
+STATIC_UNHASHED_MAX_AGE = 60
+
+# Compression of dynamic responses by core.middleware.CompressionMiddleware:
+# encodings in order of preference ('br' needs the brotli package),
+# their levels, the smallest body worth it (bytes) and the content types
+RESPONSE_COMPRESSION_ENCODINGS = ('br', 'gzip')
+
+RESPONSE_COMPRESSION_LEVELS = {'br': 4, 'gzip': 6}
+
+RESPONSE_COMPRESSION_MIN_SIZE = 1024
+
+RESPONSE_COMPRESSION_TYPES = (
+    'text/',
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+MEDIA_URL = '/media/'
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Widths (px) of the post image thumbnails offered in srcset and the
+# sizes attribute telling the browser which one it needs; the quality
+# of the thumbnails and the cache of sorl's key-value store of image
+# sizes are sorl-thumbnail settings
+THUMBNAIL_WIDTHS = (320, 640, 960)
+
+THUMBNAIL_SIZES = '(max-width: 960px) 100vw, 960px'
+
+THUMBNAIL_QUALITY = 85
+
+THUMBNAIL_CACHE = 'default'
+
+# Constants
+LOGIN_URL = 'users:login'
+
+LOGIN_REDIRECT_URL = 'posts:index'
+
+LOGOUT_URL = 'users:logout'
+
+EMPTY_VALUE_DISPLAY = '-пусто-'
+
+POSTS_PER_PAGE = 10
+
+# Feeds (url names: index, group_list, profile) paged by keyset cursor
+# (?cursor=) instead of page number (?page=)
+CURSOR_PAGINATED_FEEDS = ()
+
+# Follow feeds show the newest TIMELINE_LENGTH posts pushed to them;
+# posts of authors with more followers than TIMELINE_FANOUT_LIMIT are
+# read by author instead of being copied to every follower. Entries
+# past TIMELINE_LENGTH are deleted by a job run at most
+# TIMELINE_TRIM_DELAY seconds after new ones are added
+TIMELINE_LENGTH = 800
+
+TIMELINE_FANOUT_LIMIT = 1000
+
+TIMELINE_TRIM_DELAY = 600
+
+# Cache alias and timeout (seconds) of the rendered post cards
+POST_CARDS_CACHE = 'default'
+
+POST_CARDS_TIMEOUT = 60 * 60 * 24
+
+# Send feed pages (index, group_list, profile, follow_index) in chunks,
+# the head before the posts are read, see core.streaming. The test
+# client records no context of a streamed page.
+STREAMING_FEEDS = False
+
+# Cache alias and timeout (seconds) of whole feed pages for anonymous users
+PAGE_CACHE = 'default'
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+# Share of requests timed by core.middleware.PerformanceMiddleware, 0 to 1
+PERFORMANCE_SAMPLE_RATE = 1.0
+
+# Send the timings of sampled requests in a Server-Timing header
+PERFORMANCE_SERVER_TIMING = True
+
+# Cache alias of the per URL name histograms, kept for
+# PERFORMANCE_WINDOWS windows of PERFORMANCE_WINDOW_SECONDS each
+PERFORMANCE_CACHE = 'default'
+
+PERFORMANCE_WINDOW_SECONDS = 60
+
+PERFORMANCE_WINDOWS = 60
+
+# Fingerprint queries per request, log slow ones and N+1 suspects: a
+# query shape run N_PLUS_ONE_THRESHOLD times in one request
+QUERY_INSPECTION = False
+
+SLOW_QUERY_MS = 100
+
+N_PLUS_ONE_THRESHOLD = 5
+
+# Raise core.querylog.QueryBudgetExceeded instead of logging an error
+# when a view runs more queries than declared with @query_budget;
+# run the tests with QUERY_BUDGET_STRICT=1 to make them fail on it
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT') == '1'
+
+# core.jobs: attempts of a failing job, first retry delay (seconds,
+# doubled on every further retry) and how long a worker may hold a job
+# before another worker takes it over
+JOBS_MAX_ATTEMPTS = 5
+
+JOBS_RETRY_DELAY = 30
+
+JOBS_TIMEOUT = 60 * 5
+
+# Also run queued jobs in-process right after the transaction commits,
+# for running without the run_jobs worker
+JOBS_EAGER = False
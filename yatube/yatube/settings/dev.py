@@ -0,0 +1,9 @@
+from .base import *  # noqa: F401,F403
+
+
+DEBUG = True
+
+QUERY_INSPECTION = True
+
+# No run_jobs worker needed in development
+JOBS_EAGER = True
@@ -0,0 +1,79 @@
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa: F401,F403
+from .base import (BASE_DIR, COMPILED_TEMPLATES_DIR, DATABASES,
+                   TEMPLATE_LOADERS, TEMPLATES)
+
+
+def _env(name, default=None):
+    value = os.environ.get(name, default)
+    if value is None:
+        raise ImproperlyConfigured(f'Set the {name} environment variable')
+    return value
+
+
+DEBUG = False
+
+SECRET_KEY = _env('YATUBE_SECRET_KEY')
+
+ALLOWED_HOSTS = _env('YATUBE_ALLOWED_HOSTS').split(',')
+
+# Connections are kept open between requests instead of one per request
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(_env('YATUBE_CONN_MAX_AGE', 600))
+
+if 'YATUBE_REPLICA_DATABASE_PATH' in os.environ:
+    READ_REPLICA = 'replica'
+
+# Shared by all the processes: page cache generations, card versions
+# and the performance counters must be seen by every worker, with
+# incr() atomic across them. Memcached (python-memcached) at
+# YATUBE_CACHE_LOCATION is the default. The file-based cache is a
+# single host fallback to be named in YATUBE_CACHE_BACKEND: its incr()
+# is not atomic, so counters may lose increments, and past MAX_ENTRIES
+# it deletes 1/CULL_FREQUENCY of its files. Django's default of 300
+# entries would not even hold the page cache, post cards and
+# histograms.
+FILE_BASED_CACHE = 'django.core.cache.backends.filebased.FileBasedCache'
+
+CACHES = {
+    'default': {
+        'BACKEND': _env('YATUBE_CACHE_BACKEND',
+                        'django.core.cache.backends.memcached.MemcachedCache'),
+        'TIMEOUT': None,
+    }
+}
+
+if CACHES['default']['BACKEND'] == FILE_BASED_CACHE:
+    CACHES['default']['LOCATION'] = _env('YATUBE_CACHE_LOCATION',
+                                         os.path.join(BASE_DIR, '.cache'))
+    CACHES['default']['OPTIONS'] = {
+        'MAX_ENTRIES': int(_env('YATUBE_CACHE_MAX_ENTRIES', 200000)),
+        'CULL_FREQUENCY': 10,
+    }
+else:
+    CACHES['default']['LOCATION'] = _env('YATUBE_CACHE_LOCATION',
+                                         '127.0.0.1:11211')
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Templates are parsed once per process, compiled ones found first
+TEMPLATES[0]['DIRS'].insert(0, COMPILED_TEMPLATES_DIR)
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+]
+TEMPLATES[0]['OPTIONS']['context_processors'].remove(
+    'django.template.context_processors.debug')
+
+PERFORMANCE_SAMPLE_RATE = float(_env('YATUBE_PERFORMANCE_SAMPLE_RATE', 0.01))
+
+PERFORMANCE_SERVER_TIMING = False
+
+# Content hashed names and gzip/brotli variants, built by collectstatic
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStorage'
+
+SERVE_STATIC = _env('YATUBE_SERVE_STATIC', '0') == '1'
+
+STREAMING_FEEDS = _env('YATUBE_STREAMING_FEEDS', '1') == '1'
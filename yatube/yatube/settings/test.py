@@ -0,0 +1,13 @@
+from .base import *  # noqa: F401,F403
+
+
+# Hashing with the default hasher is most of the time of user fixtures
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+# Views going over their query budget fail the tests
+QUERY_INSPECTION = True
+
+QUERY_BUDGET_STRICT = True